@@ -0,0 +1,124 @@
+"""Prefetch issues on a pool of worker threads.
+
+``python-jira`` is synchronous, so ``AsyncJira`` does not make requests
+asynchronously itself: it runs ordinary ``python-jira`` calls on a
+``ThreadPoolExecutor`` (sharing the client's keep-alive connections; see
+``utils.get_jira``) and exposes them as coroutines, so a caller can use
+``asyncio.gather`` to keep several requests in flight.  However many
+``AsyncJira`` instances are in use, at most
+``constants.ASYNC_JIRA_CONCURRENCY`` of their requests to any one server
+are in flight at once.
+
+Its only user is ``prefetched_issues``, which ``fetch`` uses to request
+the issues of the subtasks it is about to clone all at once.  The issues
+are held in a process-wide table -- keyed by server and issue key --
+until the context exits; ``TicketFolder.issue`` consults that table
+before requesting an issue itself.
+
+"""
+import asyncio
+import concurrent.futures
+import contextlib
+import functools
+import logging
+import threading
+
+from . import constants
+
+logger = logging.getLogger(__name__)
+
+
+_server_limits = {}
+_server_limits_lock = threading.Lock()
+
+
+def get_server_limit(server):
+    """Return the semaphore limiting concurrent requests to ``server``."""
+    with _server_limits_lock:
+        if server not in _server_limits:
+            _server_limits[server] = threading.BoundedSemaphore(
+                constants.ASYNC_JIRA_CONCURRENCY
+            )
+        return _server_limits[server]
+
+
+class AsyncJira(object):
+    def __init__(self, jira, server):
+        self.jira = jira
+        self.limit = get_server_limit(server.rstrip("/"))
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=constants.ASYNC_JIRA_CONCURRENCY
+        )
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+    def _call_limited(self, function):
+        with self.limit:
+            return function()
+
+    async def call(self, function, *args, **kwargs):
+        """Run ``function(*args, **kwargs)`` on a worker thread."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor,
+            self._call_limited,
+            functools.partial(function, *args, **kwargs),
+        )
+
+    async def issue(self, key, fields=None, expand=None):
+        return await self.call(self.jira.issue, key, fields=fields, expand=expand)
+
+    async def issues(self, keys, **kwargs):
+        """Return the issues for ``keys``; failures are returned in place."""
+        return await asyncio.gather(
+            *(self.issue(key, **kwargs) for key in keys), return_exceptions=True
+        )
+
+
+_prefetched_issues = {}
+_prefetched_issues_lock = threading.Lock()
+
+
+def get_prefetched_issue(server, key):
+    with _prefetched_issues_lock:
+        return _prefetched_issues.get((server.rstrip("/"), key))
+
+
+@contextlib.contextmanager
+def prefetched_issues(jira, server, keys):
+    """Fetch the issues for ``keys`` concurrently, then hold them for reuse.
+
+    While the context is active, ``TicketFolder.issue`` uses these issues
+    rather than requesting them one at a time; issues that could not be
+    fetched are requested normally.
+
+    """
+
+    async def fetch():
+        async with AsyncJira(jira, server) as async_jira:
+            return await async_jira.issues(keys)
+
+    server = server.rstrip("/")
+    fetched = {}
+    if len(keys) > 1:
+        for key, issue in zip(keys, asyncio.run(fetch())):
+            if isinstance(issue, Exception):
+                logger.debug("Could not prefetch issue %s: %s", key, issue)
+                continue
+            fetched[(server, key)] = issue
+
+    with _prefetched_issues_lock:
+        _prefetched_issues.update(fetched)
+    try:
+        yield
+    finally:
+        with _prefetched_issues_lock:
+            for fetched_key in fetched:
+                _prefetched_issues.pop(fetched_key, None)
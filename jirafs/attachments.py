@@ -0,0 +1,116 @@
+"""Lookups over an issue's attachments.
+
+``AttachmentIndex`` is built once for each issue loaded by a ticket folder
+(see ``TicketFolder.attachments``).  Jira allows several attachments to
+share a filename; when they do, the one listed last -- the most recently
+uploaded -- is the one Jirafs keeps a local copy of.
+
+The remote file metadata (``.jirafs/remote_files.json``) records, for
+each downloaded or uploaded file, the attachment it corresponds to::
+
+    {"created": ..., "id": ..., "size": ..., "digest": ...}
+
+where ``digest`` is the git object id of the file's content.  Older
+folders record only the attachment's ``created`` timestamp.
+
+"""
+import collections
+
+AttachmentDiff = collections.namedtuple(
+    "AttachmentDiff",
+    [
+        "added",  # Attached, but not yet downloaded
+        "changed",  # Downloaded, but a different attachment is now current
+        "removed",  # Downloaded, but no longer attached
+    ],
+)
+
+
+def get_metadata_entry(value):
+    """Return a remote file metadata entry, upgrading older entries."""
+    if isinstance(value, str):
+        return {"created": value}
+    return dict(value or {})
+
+
+def build_metadata_entry(attachment, digest):
+    return {
+        "created": attachment.created,
+        "id": attachment.id,
+        "size": getattr(attachment, "size", None),
+        "digest": digest,
+    }
+
+
+def is_current(value, attachment):
+    """Return whether a metadata entry describes ``attachment``.
+
+    Attachments cannot be altered once uploaded, so an entry recording
+    the attachment's id (and size) describes it regardless of how its
+    timestamp is formatted.
+
+    """
+    entry = get_metadata_entry(value)
+    if entry.get("id") is not None:
+        return entry["id"] == attachment.id and entry.get("size") == getattr(
+            attachment, "size", None
+        )
+    return entry.get("created") == attachment.created
+
+
+class AttachmentIndex(object):
+    def __init__(self, attachments):
+        self.attachments = list(attachments)
+        self.by_filename = collections.OrderedDict()
+        self.by_id = {}
+
+        for attachment in self.attachments:
+            self.by_filename.setdefault(attachment.filename, []).append(attachment)
+            self.by_id[attachment.id] = attachment
+
+    def __contains__(self, filename):
+        return filename in self.by_filename
+
+    def __iter__(self):
+        return iter(self.by_filename)
+
+    def __len__(self):
+        return len(self.by_filename)
+
+    def get(self, filename, default=None):
+        """Return the current attachment having ``filename``."""
+        attachments = self.by_filename.get(filename)
+        if not attachments:
+            return default
+        return attachments[-1]
+
+    def get_all(self, filename):
+        """Return every attachment having ``filename``."""
+        return list(self.by_filename.get(filename, []))
+
+    def diff(self, metadata, filenames=None):
+        """Compare attachments with the remote file metadata of a folder.
+
+        ``metadata`` maps each downloaded filename to its metadata
+        entry (see ``get_metadata_entry``).  Only
+        ``filenames`` (by default, all attachments' filenames) are
+        considered to be attached.
+
+        """
+        if filenames is None:
+            filenames = self.by_filename.keys()
+        filenames = [filename for filename in filenames if filename in self]
+
+        added = []
+        changed = []
+        for filename in filenames:
+            attachment = self.get(filename)
+            if filename not in metadata:
+                added.append(filename)
+            elif not is_current(metadata[filename], attachment):
+                changed.append(filename)
+
+        attached = set(filenames)
+        removed = [filename for filename in metadata if filename not in attached]
+
+        return AttachmentDiff(added, changed, removed)
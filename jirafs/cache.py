@@ -0,0 +1,51 @@
+import json
+import os
+import tempfile
+
+from . import constants
+
+
+def get_cache_path(*parts):
+    """Return a path within Jirafs' per-user cache directory.
+
+    The directory is ``$JIRAFS_CACHE_DIR`` if set, otherwise ``jirafs``
+    within ``$XDG_CACHE_HOME`` (or ``~/.cache``).
+
+    """
+    cache_dir = constants.CACHE_DIR
+    if not cache_dir:
+        cache_dir = os.path.join(
+            os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"),
+            "jirafs",
+        )
+    return os.path.join(cache_dir, *parts)
+
+
+def read_json_cache(name, key):
+    """Return the data cached under ``name`` if it was stored for ``key``."""
+    try:
+        with open(get_cache_path(name), "r", encoding="utf-8") as _in:
+            stored = json.load(_in)
+    except (IOError, OSError, ValueError):
+        return None
+
+    if not isinstance(stored, dict) or stored.get("key") != key:
+        return None
+    return stored.get("data")
+
+
+def write_json_cache(name, key, data):
+    """Store ``data`` under ``name`` for ``key``; failures are ignored."""
+    path = get_cache_path(name)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as out:
+                json.dump({"key": key, "data": data}, out)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+    except (IOError, OSError):
+        pass
@@ -1,6 +1,7 @@
 import argparse
 import codecs
 import copy
+import io
 import logging
 import logging.config
 import os
@@ -10,25 +11,16 @@ import sys
 import time
 import traceback
 
-from blessings import Terminal
-
-try:
-    from jira.utils import JIRAError
-except ImportError:
-    from jira.exceptions import JIRAError
-from distutils.version import LooseVersion
-
-from . import utils
+from . import daemon
 from .exceptions import (
     GitCommandError,
-    JiraInteractionFailed,
     JirafsError,
+    JiraInteractionFailed,
+    MacroError,
     NotTicketFolderException,
     UnknownMacroError,
-    MacroError,
 )
 
-
 # Write data to stdout as UTF-8 bytes when there's no encoding specified
 if sys.version_info < (3,) and sys.stdout.encoding is None:
     sys.stdout = codecs.getwriter("utf-8")(sys.stdout)
@@ -56,7 +48,49 @@ LOGGING = {
 }
 
 
+def get_jira_error_class():
+    """Return python-jira's exception class if python-jira is loaded.
+
+    python-jira is imported only by commands that interact with Jira; if
+    it has not been imported, no ``JIRAError`` can have been raised.
+
+    """
+    if "jira" not in sys.modules:
+        return ()
+
+    try:
+        from jira.utils import JIRAError
+    except ImportError:
+        from jira.exceptions import JIRAError
+    return JIRAError
+
+
+def has_file_descriptor(stream):
+    try:
+        stream.fileno()
+    except (AttributeError, ValueError, io.UnsupportedOperation):
+        return False
+    return True
+
+
 def main():
+    # Hand the command to a running daemon before importing anything
+    # else; see ``jirafs.daemon``.
+    if daemon.should_forward(sys.argv):
+        exit_code = daemon.forward(sys.argv, os.getcwd())
+        if exit_code is not None:
+            sys.exit(exit_code)
+
+    run()
+
+
+def run():
+    from distutils.version import LooseVersion
+
+    from blessings import Terminal
+
+    from . import output, utils
+
     term = Terminal()
     if sys.version_info < (2, 7):
         raise RuntimeError(
@@ -64,7 +98,7 @@ def main():
             "any version of Python 3.  Please upgrade your version of "
             "python before using Jirafs."
         )
-    if utils.get_git_version() < LooseVersion("1.8"):
+    if utils.get_git_capabilities().version < LooseVersion("1.8"):
         raise RuntimeError(
             "Jirafs requires minimally version 1.8 of Git.  Please "
             "upgrade your version of git before using Jirafs."
@@ -76,7 +110,7 @@ def main():
         description="Edit Jira issues locally from your filesystem",
         add_help=False,
     )
-    parser.add_argument("command", type=str, choices=commands.keys())
+    parser.add_argument("command", type=str, choices=commands.names())
     parser.add_argument("--subtasks", action="store_true", default=False)
     parser.add_argument(
         "--log-level",
@@ -84,6 +118,15 @@ def main():
         dest="log_level",
     )
     parser.add_argument("--folder", default=os.getcwd())
+    parser.add_argument(
+        "--output-format",
+        choices=output.FORMATS,
+        default=None,
+        help=(
+            "Write each ticket folder's result as text (the default) "
+            "or as a line of JSON."
+        ),
+    )
     parser.add_argument(
         "--no-subfolders",
         action="store_true",
@@ -112,6 +155,8 @@ def main():
         help=("Launch ptvsd debugger on --debugger-port."),
     )
     args, extra = parser.parse_known_args()
+    if args.command not in commands:
+        parser.error(commands.get_error(args.command))
 
     if args.debugger:
         try:
@@ -140,6 +185,9 @@ def main():
             )
             sys.exit(1)
 
+    channel = output.set_format(args.output_format)
+    channel.start()
+
     logging.config.dictConfig(LOGGING)
     root_logger = logging.getLogger()
     root_logger.setLevel(logging.getLevelName(args.log_level))
@@ -149,7 +197,9 @@ def main():
 
     # Subtasks
     if args.subtasks:
-        cmd_class.RUN_FOR_SUBTASKS = True
+        # Subclass rather than altering the installed command; a daemon
+        # runs many commands in one process.
+        cmd_class = type(cmd_class.__name__, (cmd_class,), {"RUN_FOR_SUBTASKS": True})
 
     started = time.time()
     logger.debug("Command %s(%s) started", command_name, extra)
@@ -164,8 +214,8 @@ def main():
             extra,
             (time.time() - started),
         )
-        if value:
-            value.echo()
+        if value is not None:
+            channel.result(value, command_name, os.path.abspath(args.folder))
         sys.exit(value.return_code)
     except GitCommandError as e:
         print(
@@ -182,13 +232,15 @@ def main():
         print("{t.normal}".format(t=term))
         if args.traceback:
             traceback.print_exc()
+        channel.error(10, e, command_name, os.path.abspath(args.folder))
         sys.exit(10)
-    except NotTicketFolderException:
+    except NotTicketFolderException as e:
         if not getattr(cmd_class, "TRY_SUBFOLDERS", False):
             print(
                 "{t.red}The command '{cmd}' must be ran from "
                 "within an issue folder.{t.normal}".format(t=term, cmd=command_name)
             )
+            channel.error(20, e, command_name, os.path.abspath(args.folder))
             sys.exit(20)
         elif args.no_subfolders:
             sys.exit(20)
@@ -206,11 +258,30 @@ def main():
                 full_args = copy.copy(sys.argv)
                 if "--no-subfolders" not in full_args:
                     full_args.append("--no-subfolders")
-                result = subprocess.call(
-                    " ".join([shlex.quote(a) for a in full_args]),
-                    cwd=full_path,
-                    shell=True,
-                )
+                if has_file_descriptor(sys.stdout):
+                    result = subprocess.call(
+                        " ".join([shlex.quote(a) for a in full_args]),
+                        cwd=full_path,
+                        shell=True,
+                    )
+                else:
+                    # Output is being sent elsewhere (e.g. to a daemon's
+                    # client); relay the subprocess' output there, too.
+                    process = subprocess.run(
+                        " ".join([shlex.quote(a) for a in full_args]),
+                        cwd=full_path,
+                        shell=True,
+                        stdout=subprocess.PIPE,
+                        stderr=(
+                            subprocess.PIPE if channel.structured else subprocess.STDOUT
+                        ),
+                    )
+                    channel.get_stream().write(
+                        process.stdout.decode("utf-8", "replace")
+                    )
+                    if process.stderr:
+                        sys.stderr.write(process.stderr.decode("utf-8", "replace"))
+                    result = process.returncode
                 if result == 0:
                     count_runs += 1
             except NotTicketFolderException:
@@ -218,6 +289,7 @@ def main():
         if count_runs == 0:
             if args.traceback:
                 traceback.print_exc()
+            channel.error(21, e, command_name, os.path.abspath(args.folder))
             sys.exit(21)
     except UnknownMacroError as e:
         print(
@@ -227,6 +299,7 @@ def main():
         )
         if args.traceback:
             traceback.print_exc()
+        channel.error(30, e, command_name, os.path.abspath(args.folder))
         sys.exit(30)
     except MacroError as e:
         print(
@@ -238,8 +311,9 @@ def main():
         )
         if args.traceback:
             traceback.print_exc()
+        channel.error(40, e, command_name, os.path.abspath(args.folder))
         sys.exit(40)
-    except JIRAError as e:
+    except get_jira_error_class() as e:
         print(
             "{t.red}Jirafs encountered an error while interacting with "
             "your Jira instance: {t.normal}{t.red}{t.bold}{error}"
@@ -247,6 +321,7 @@ def main():
         )
         if args.traceback:
             traceback.print_exc()
+        channel.error(70, e, command_name, os.path.abspath(args.folder))
         sys.exit(70)
     except JiraInteractionFailed as e:
         print(
@@ -257,6 +332,7 @@ def main():
         )
         if args.traceback:
             traceback.print_exc()
+        channel.error(80, e, command_name, os.path.abspath(args.folder))
         sys.exit(80)
     except JirafsError as e:
         print(
@@ -267,8 +343,10 @@ def main():
         )
         if args.traceback:
             traceback.print_exc()
+        channel.error(90, e, command_name, os.path.abspath(args.folder))
         sys.exit(90)
     finally:
         if args.profile:
             profiler.stop()
             print(profiler.output_text(unicode=True, color=True))
+        channel.stop()
@@ -2,7 +2,7 @@ import configparser
 
 from jirafs import utils
 from jirafs.exceptions import NotTicketFolderException
-from jirafs.plugin import CommandResult, DirectOutputCommandPlugin
+from jirafs.plugin import CommandResult, CommandResultBuilder, DirectOutputCommandPlugin
 from jirafs.ticketfolder import TicketFolder
 
 
@@ -14,6 +14,12 @@ class Command(DirectOutputCommandPlugin):
     AUTOMATICALLY_INSTANTIATE_FOLDER = False
 
     def main(self, args, jira, path, parser, **kwargs):
+        if args.purge_cache:
+            from jirafs import httpcache
+
+            httpcache.purge()
+            return CommandResult("Cached Jira responses were discarded.")
+
         if args.global_config:
             config = utils.get_config()
         else:
@@ -76,7 +82,7 @@ class Command(DirectOutputCommandPlugin):
             pass
 
     def list(self, config):
-        lines = CommandResult()
+        lines = CommandResultBuilder()
 
         for section in config.sections():
             parameters = config.items(section)
@@ -91,6 +97,12 @@ class Command(DirectOutputCommandPlugin):
         parser.add_argument("--list", action="store_true")
         parser.add_argument("--get", action="store_true")
         parser.add_argument("--set", action="store_true")
+        parser.add_argument(
+            "--purge-cache",
+            dest="purge_cache",
+            action="store_true",
+            help="Discard cached responses from Jira.",
+        )
         parser.add_argument(
             "--global", dest="global_config", default=False, action="store_true"
         )
@@ -99,7 +111,7 @@ class Command(DirectOutputCommandPlugin):
     def parse_arguments(self, parser, args):
         args = super(Command, self).parse_arguments(parser, args)
 
-        if not args.list and not args.get and not args.set:
+        if not any([args.list, args.get, args.set, args.purge_cache]):
             args.list = True
 
         return args
@@ -0,0 +1,72 @@
+import datetime
+
+from jirafs import daemon
+from jirafs.plugin import CommandResult, DirectOutputCommandPlugin
+
+
+class Command(DirectOutputCommandPlugin):
+    """Run commands in a resident process to speed up later invocations"""
+
+    MIN_VERSION = "2.0.0"
+    MAX_VERSION = "3.0.0"
+    AUTOMATICALLY_INSTANTIATE_FOLDER = False
+    RUN_IN_DAEMON = False
+
+    def main(self, args, **kwargs):
+        if args.status:
+            return self.status()
+        elif args.stop:
+            return self.stop()
+
+        server = daemon.create_server()
+        print(f"Listening on {server.path}; press Ctrl+C to stop.")
+        try:
+            server.serve()
+        except KeyboardInterrupt:
+            pass
+
+    def request(self, action):
+        client = daemon.connect()
+        if client is None:
+            return None
+
+        try:
+            return next(daemon.send_request(client, {"action": action}), None)
+        finally:
+            client.close()
+
+    def status(self):
+        status = self.request("status")
+        if status is None:
+            return CommandResult("The Jirafs daemon is not running.", return_code=1)
+
+        started = datetime.datetime.fromtimestamp(status["started"])
+        return CommandResult(
+            "The Jirafs daemon (version {version}; PID {pid}) has been "
+            "running since {started:%Y-%m-%d %H:%M:%S} and has run "
+            "{commands} commands.".format(
+                version=status["version"],
+                pid=status["pid"],
+                started=started,
+                commands=status["commands"],
+            )
+        )
+
+    def stop(self):
+        if self.request("stop") is None:
+            return CommandResult("The Jirafs daemon is not running.", return_code=1)
+        return CommandResult("The Jirafs daemon was stopped.")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--status",
+            action="store_true",
+            default=False,
+            help="Show whether the daemon is running.",
+        )
+        parser.add_argument(
+            "--stop",
+            action="store_true",
+            default=False,
+            help="Stop the running daemon.",
+        )
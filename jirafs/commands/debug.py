@@ -11,6 +11,7 @@ class Command(CommandPlugin):
 
     MIN_VERSION = "2.0.0"
     MAX_VERSION = "3.0.0"
+    RUN_IN_DAEMON = False
 
     def main(self, folder, **kwargs):
         return pdb.set_trace()
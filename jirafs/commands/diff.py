@@ -6,6 +6,7 @@ class Command(CommandPlugin):
 
     MIN_VERSION = "2.0.0"
     MAX_VERSION = "3.0.0"
+    LAZY_FOLDER = True
 
     def main(self, folder, **kwargs):
         result = folder.run_git_command("diff")
@@ -4,7 +4,7 @@ import os
 
 from dateutil.parser import parse
 
-from jirafs import constants, utils
+from jirafs import asyncjira, attachments, constants, parallel, utils
 from jirafs.plugin import CommandPlugin
 
 
@@ -30,24 +30,21 @@ class Command(CommandPlugin):
         original_hash = folder.run_git_command("rev-parse", "jira")
 
         for filename in folder.get_remotely_changed():
-            for attachment in folder.issue.fields.attachment:
-                if attachment.filename == filename:
-                    folder.log(
-                        'Download file "%s"',
-                        (attachment.filename,),
-                    )
-                    content = io.BytesIO(attachment.get())
-                    save_path = folder.get_shadow_path(filename)
-                    with open(save_path, "wb") as save_file:
-                        content.seek(0)
-                        save_file.write(content.read())
-                        file_meta[filename] = attachment.created
+            attachment = folder.attachments.get(filename)
+            folder.log(
+                'Download file "%s"',
+                (attachment.filename,),
+            )
+            content = attachment.get()
+            folder.shadow.write(filename, content)
+            file_meta[filename] = attachments.build_metadata_entry(
+                attachment, folder.shadow.get_content_id(content)
+            )
 
         folder.set_remote_file_metadata(file_meta, shadow=True)
 
         field_map = self.get_field_map(folder)
-        detail_path = folder.get_shadow_path(constants.TICKET_DETAILS)
-        with io.open(detail_path, "w", encoding="utf-8") as dets:
+        with io.StringIO() as dets:
             for field in sorted(folder.issue.raw["fields"].keys()):
                 value = folder.issue.raw["fields"][field]
                 if isinstance(value, str):
@@ -68,14 +65,10 @@ class Command(CommandPlugin):
                     # Write specific fields to their own files without
                     # significant alteration
 
-                    file_field_path = folder.get_shadow_path(
-                        constants.TICKET_FILE_FIELD_TEMPLATE
-                    ).format(field_name=field)
-                    with io.open(
-                        file_field_path, "w", encoding="utf-8"
-                    ) as file_field_file:
-                        file_field_file.write(str(value))
-                        file_field_file.write("\n")  # For unix' sake
+                    folder.shadow.write(
+                        constants.TICKET_FILE_FIELD_TEMPLATE.format(field_name=field),
+                        str(value) + "\n",  # For unix' sake
+                    )
                 else:
                     # Normal fields, though, just go into the standard
                     # fields file.
@@ -89,8 +82,9 @@ class Command(CommandPlugin):
                     for line in value.replace("\r\n", "\n").split("\n"):
                         dets.write("    %s\n" % line)
 
-        links_path = folder.get_shadow_path(constants.TICKET_LINKS)
-        with io.open(links_path, "w", encoding="utf-8") as links_handle:
+            folder.shadow.write(constants.TICKET_DETAILS, dets.getvalue())
+
+        with io.StringIO() as links_handle:
             # Write issue links
             for link in folder.issue.fields.issuelinks:
                 category = "outward"
@@ -105,7 +99,7 @@ class Command(CommandPlugin):
                 )
 
             # Write remote links
-            for link in folder.jira.remote_links(folder.issue):
+            for link in folder.get_remote_links():
                 if link.object.title:
                     links_handle.write(
                         "* {title}: {url}\n".format(
@@ -117,9 +111,10 @@ class Command(CommandPlugin):
                         "* {url}\n".format(title=link.object.title, url=link.object.url)
                     )
 
-        comments_filename = folder.get_shadow_path(constants.TICKET_COMMENTS)
-        with io.open(comments_filename, "w", encoding="utf-8") as comm:
-            for comment in folder.issue.fields.comment.comments:
+            folder.shadow.write(constants.TICKET_LINKS, links_handle.getvalue())
+
+        with io.StringIO() as comm:
+            for comment in folder.iter_comments():
                 comm.write(
                     "h3. On %s, [~%s] wrote:\n\n"
                     % (
@@ -130,6 +125,8 @@ class Command(CommandPlugin):
                 comm.write(comment.body.replace("\r\n", "\n"))
                 comm.write("\n\n")
 
+            folder.shadow.write(constants.TICKET_COMMENTS, comm.getvalue())
+
         folder.store_cached_issue()
 
         # Clone subtasks
@@ -137,25 +134,32 @@ class Command(CommandPlugin):
         if len(subtasks) > 0:
             commands = utils.get_installed_commands()
             jira = utils.lazy_get_jira()
+            missing = [
+                issue
+                for issue in subtasks
+                if not os.path.exists(folder.get_path(issue.key))
+            ]
+
+            def clone(issue):
+                command_name = "clone"
+                args = [issue.permalink(), folder.get_path(issue.key)]
+                commands[command_name].execute_command(
+                    args, jira=jira, path=folder.path, command_name=command_name
+                )
+
             with open(folder.get_metadata_path("subtasks"), "w") as out:
                 for issue in subtasks:
                     out.write("%s\n" % issue.key)
-                    issue_path = folder.get_path(issue.key)
-                    if not os.path.exists(issue_path):
-                        command_name = "clone"
-                        args = [issue.permalink(), issue_path]
-                        path = folder.path
-                        commands[command_name].execute_command(
-                            args, jira=jira, path=path, command_name=command_name
-                        )
+            with asyncjira.prefetched_issues(
+                folder.jira, folder.jira_base, [issue.key for issue in missing]
+            ):
+                cloned = parallel.run_in_order(clone, missing)
+            for item in cloned:
+                if item.error is not None:
+                    raise item.error
         folder.build_ignore_files()
 
-        folder.run_git_command("add", "-A", shadow=True)
-        folder.run_git_command(
-            "commit", "-m", "Fetched remote changes", failure_ok=True, shadow=True
-        )
-
-        folder.run_git_command("push", "origin", "jira", shadow=True)
+        folder.shadow.commit("Fetched remote changes")
         final_hash = folder.run_git_command("rev-parse", "jira")
         if original_hash != final_hash:
             folder.log("Updated 'jira' to %s" % final_hash)
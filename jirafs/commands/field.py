@@ -10,6 +10,7 @@ class Command(CommandPlugin):
     TRY_SUBFOLDERS = True
     MIN_VERSION = "2.0.0"
     MAX_VERSION = "3.0.0"
+    LAZY_FOLDER = True
 
     def handle(self, args, folder, **kwargs):
         return self.cmd(folder, args.field_name, raw=args.raw, formatted=args.formatted)
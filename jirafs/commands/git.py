@@ -8,6 +8,7 @@ class Command(CommandPlugin):
 
     MIN_VERSION = "2.0.0"
     MAX_VERSION = "3.0.0"
+    RUN_IN_DAEMON = False
 
     def handle(self, args, folder, **kwargs):
         return self.cmd(folder, *self.git_arguments)
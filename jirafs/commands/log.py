@@ -8,6 +8,8 @@ class Command(CommandPlugin):
 
     MIN_VERSION = "2.0.0"
     MAX_VERSION = "3.0.0"
+    LAZY_FOLDER = True
+    RUN_IN_DAEMON = False
 
     def main(self, folder, **kwargs):
         results = folder.get_log()
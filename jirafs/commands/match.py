@@ -11,6 +11,8 @@ class Command(CommandPlugin):
     TRY_SUBFOLDERS = True
     MIN_VERSION = "2.0.0"
     MAX_VERSION = "3.0.0"
+    LAZY_FOLDER = True
+    RUN_IN_DAEMON = False
 
     def handle(self, args, folder, **kwargs):
         return self.cmd(
@@ -0,0 +1,86 @@
+import os
+
+from jirafs import constants, parallel
+from jirafs.exceptions import NotTicketFolderException
+from jirafs.plugin import CommandResult, DirectOutputCommandPlugin
+from jirafs.ticketfolder import TicketFolder, get_folder_version
+
+
+class Command(DirectOutputCommandPlugin):
+    """Upgrade ticket folders to the current repository version"""
+
+    MIN_VERSION = "2.0.0"
+    MAX_VERSION = "3.0.0"
+    AUTOMATICALLY_INSTANTIATE_FOLDER = False
+
+    def main(self, args, jira, path, **kwargs):
+        if args.all:
+            paths = self.find_ticket_folders(path)
+        else:
+            paths = [path]
+
+        def migrate(folder_path):
+            original_version = get_folder_version(folder_path)
+            with TicketFolder(folder_path, jira, migrate=False) as folder:
+                folder.run_migrations()
+                return original_version, folder.version
+
+        result = CommandResult()
+        for item in parallel.run_in_order(migrate, paths, workers=args.jobs):
+            if args.all:
+                name = os.path.relpath(item.item, path)
+            else:
+                name = os.path.basename(os.path.realpath(item.item))
+            if isinstance(item.error, NotTicketFolderException) and not args.all:
+                raise item.error
+            elif item.error is not None:
+                result = result.add_line(
+                    "{t.red}{name}: could not be upgraded: {error}{t.normal}",
+                    name=name,
+                    error=item.error,
+                )
+                result.return_code = 1
+            elif item.result[0] == item.result[1]:
+                result = result.add_line(
+                    "{name}: already up-to-date (v{version})",
+                    name=name,
+                    version=item.result[1],
+                )
+            else:
+                result = result.add_line(
+                    "{name}: upgraded from v{original} to v{version}",
+                    name=name,
+                    original=item.result[0],
+                    version=item.result[1],
+                )
+
+        return result
+
+    def find_ticket_folders(self, path):
+        """Return the ticket folders (including subtasks) within ``path``."""
+        folders = []
+        for root, dirs, files in os.walk(path):
+            if constants.METADATA_DIR in dirs:
+                folders.append(root)
+            dirs[:] = sorted(
+                directory for directory in dirs if not directory.startswith(".")
+            )
+        return folders
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            default=False,
+            help=(
+                "Upgrade every ticket folder within the current directory, "
+                "including subtasks."
+            ),
+        )
+        parser.add_argument(
+            "--jobs",
+            "-j",
+            type=int,
+            default=constants.SUBTASK_CONCURRENCY,
+            help="Upgrade this many ticket folders at once.",
+        )
@@ -1,6 +1,6 @@
 import io
 
-from jirafs import constants, exceptions, utils
+from jirafs import attachments, constants, exceptions, utils
 from jirafs.plugin import CommandPlugin
 from jirafs.utils import run_command_method_with_kwargs
 
@@ -61,12 +61,26 @@ class Command(CommandPlugin):
                     'Deleting file "%s"',
                     (filename,),
                 )
-                for attachment in folder.issue.fields.attachment:
-                    if attachment.filename == filename and attachment.id not in deleted:
+                for attachment in folder.attachments.get_all(filename):
+                    if attachment.id not in deleted:
                         folder.jira.delete_attachment(attachment.id)
-                        deleted.add(id)
+                        deleted.add(attachment.id)
 
             for filename in status["ready"]["files"]:
+                digest = folder.run_git_command("rev-parse", "HEAD:%s" % filename)
+                current = folder.attachments.get(filename)
+                entry = attachments.get_metadata_entry(file_meta.get(filename))
+                if (
+                    current is not None
+                    and entry.get("digest") == digest
+                    and attachments.is_current(entry, current)
+                ):
+                    folder.log(
+                        'File "%s" is already attached; not uploading',
+                        (filename,),
+                    )
+                    continue
+
                 upload = io.BytesIO(
                     folder.get_local_file_at_revision(filename, "HEAD", binary=True)
                 )
@@ -75,16 +89,19 @@ class Command(CommandPlugin):
                     (filename,),
                 )
                 # Delete the existing issue if there is one
-                for attachment in folder.issue.fields.attachment:
-                    if attachment.filename == filename:
+                for attachment in folder.attachments.get_all(filename):
+                    if attachment.id not in deleted:
                         attachment.delete()
+                        deleted.add(attachment.id)
                 upload.seek(0)
                 attachment = folder.jira.add_attachment(
                     folder.ticket_number,
                     upload,
                     filename=filename,
                 )
-                file_meta[filename] = attachment.created
+                file_meta[filename] = attachments.build_metadata_entry(
+                    attachment, digest
+                )
 
             folder.set_remote_file_metadata(file_meta, shadow=False)
 
@@ -152,10 +169,13 @@ class Command(CommandPlugin):
                             existing_link.update()
 
             links = status["ready"]["links"]
-            remote_links = folder.jira.remote_links(folder.issue)
-            # Workaround for bug in python-jira:
-            folder.jira._applicationlinks = []
-            for target, data in links.get("remote", {}).items():
+            remote_link_changes = links.get("remote", {})
+            if remote_link_changes:
+                remote_links = folder.get_remote_links(refresh=True)
+                # Workaround for bug in python-jira:
+                folder.jira._applicationlinks = []
+                folder.invalidate_remote_links()
+            for target, data in remote_link_changes.items():
                 orig = data[0]
                 new = data[1]
                 if orig is None:
@@ -190,14 +210,8 @@ class Command(CommandPlugin):
                 "commit", "-m", "Pushed local changes", failure_ok=True
             )
 
-            # Commit changes to remote copy, too, so we record remote
-            # file metadata.
-            folder.run_git_command("fetch", shadow=True)
-            folder.run_git_command("merge", "origin/master", shadow=True)
-            folder.run_git_command("add", "-A", shadow=True)
-            folder.run_git_command(
-                "commit", "-m", "Pulled remote changes", failure_ok=True, shadow=True
-            )
-            folder.run_git_command("push", "origin", "jira", shadow=True)
+            # Move the 'jira' branch up to our local copy, too, so we
+            # record remote file metadata.
+            folder.shadow.fast_forward("master")
             pull_result = run_command_method_with_kwargs("pull", folder=folder)
             return pull_result[1]
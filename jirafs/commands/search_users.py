@@ -2,8 +2,6 @@ from __future__ import print_function
 
 import json
 
-from prettytable import PrettyTable
-
 from jirafs import utils
 from jirafs.plugin import CommandResult, DirectOutputCommandPlugin
 from jirafs.ticketfolder import TicketFolder
@@ -34,6 +32,8 @@ class Command(DirectOutputCommandPlugin):
         if not users:
             return CommandResult("No matching users were found", return_code=1)
 
+        from prettytable import PrettyTable
+
         table = PrettyTable(["Name", "Username", "Email Address", "Time Zone"])
         table.align = "l"
         for user in users:
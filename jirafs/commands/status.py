@@ -1,6 +1,6 @@
 import json
 
-from jirafs.plugin import CommandPlugin, CommandResult
+from jirafs.plugin import CommandPlugin, CommandResult, CommandResultBuilder
 
 
 class Command(CommandPlugin):
@@ -9,6 +9,7 @@ class Command(CommandPlugin):
     TRY_SUBFOLDERS = True
     MIN_VERSION = "2.0.0"
     MAX_VERSION = "3.0.0"
+    LAZY_FOLDER = True
 
     def handle(self, args, folder, **kwargs):
         return self.cmd(folder, args.format)
@@ -38,12 +39,12 @@ class Command(CommandPlugin):
                 return True
 
     def status_text(self, folder, folder_status):
-        result = CommandResult()
+        result = CommandResultBuilder()
 
         result = result.add_line(
             "On ticket {ticket} ({url})",
             ticket=folder.ticket_number,
-            url=folder.cached_issue.permalink(),
+            url=folder.cached_issue_header["permalink"],
         )
         if not folder_status["up_to_date"]:
             result = result.add_line(
@@ -126,7 +127,7 @@ class Command(CommandPlugin):
 
     def format_field_changes(self, changes, color, files_post_message="", result=None):
         if result is None:
-            result = CommandResult()
+            result = CommandResultBuilder()
 
         for filename in changes.get("files", []):
             result = result.add_line(
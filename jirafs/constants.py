@@ -15,12 +15,19 @@ REMOTE_IGNORE_FILE = ".jirafs_remote_ignore"
 GIT_IGNORE_FILE_PARTIAL = ".jirafs_ignore"
 GIT_IGNORE_FILE = ".jirafs/combined_ignore"
 GIT_EXCLUDE_FILE = ".jirafs/git/info/exclude"
+GIT_IGNORE_STAMP_FILE = ".jirafs/git/jirafs_ignore_stamp"
 TICKET_OPERATION_LOG = "operation.log"
 METADATA_DIR = ".jirafs"
 GLOBAL_CONFIG = ".jirafs_config"
 TEMP_GENERATED_FILES = ".jirafs/temp-generated"
-GIT_AUTHOR = "Jirafs %s <jirafs@localhost>" % (version)
+ISSUE_CACHE = ".jirafs/issue.json"
+REMOTE_LINKS_CACHE = ".jirafs/remote_links.json"
+GIT_AUTHOR_NAME = "Jirafs %s" % (version)
+GIT_AUTHOR_EMAIL = "jirafs@localhost"
+GIT_AUTHOR = "%s <%s>" % (GIT_AUTHOR_NAME, GIT_AUTHOR_EMAIL)
 DEFAULT_BRANCH = "master"
+CACHE_DIR = ""
+DAEMON_SOCKET = ""
 
 # Config sections
 CONFIG_JIRA = "jira"
@@ -41,7 +48,29 @@ ALLOW_USER_INPUT = True
 
 DEFAULT_DATE_FORMAT = "%Y-%m-%d at %H:%M:%S %Z"
 
-CURRENT_REPO_VERSION = 17
+DEFAULT_COMMENT_PAGE_SIZE = 100
+
+JIRA_CONNECTION_POOL_SIZE = 16
+ASYNC_JIRA_CONCURRENCY = 8
+SUBTASK_CONCURRENCY = 4
+
+# Format in which command results are written; see jirafs.output
+OUTPUT_FORMAT = "text"
+
+# Request scheduling; see jirafs.scheduler
+JIRA_REQUESTS_PER_SECOND = 20
+JIRA_REQUEST_BURST = 20
+JIRA_CONCURRENCY = 8
+JIRA_MAX_RETRIES = 5
+JIRA_RETRY_BACKOFF = 0.5
+JIRA_RETRY_BACKOFF_MAX = 30
+
+DEFAULT_ISSUE_CACHE_FORMAT = "pretty"
+
+# Write operation logs from a background thread; see jirafs.operationlog
+ASYNC_OPERATION_LOG = False
+
+CURRENT_REPO_VERSION = 18
 
 
 override(locals(), "JIRAFS_")
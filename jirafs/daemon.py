@@ -0,0 +1,317 @@
+"""A resident Jirafs process that runs commands on behalf of the CLI.
+
+``jirafs daemon`` listens on a Unix socket; while it is running, the
+``jirafs`` command-line client forwards each command to it rather than
+starting, importing and connecting to Jira from scratch.  Commands run
+in the daemon one at a time, in the client's working directory, and
+their output is streamed back to the client.
+
+Each request is a single line of JSON; each response is a series of
+lines of JSON, each holding one of:
+
+* ``{"stdout": "..."}`` or ``{"stderr": "..."}``: output to display;
+* ``{"exit": <code>}``: the command finished with this exit code;
+* ``{"fallback": true}``: the command can't run in the daemon (e.g.
+  because it is interactive), so the client should run it itself.
+
+"""
+import io
+import json
+import logging
+import os
+import socket
+import socketserver
+import sys
+import threading
+import time
+
+from . import __version__, cache, constants
+
+logger = logging.getLogger(__name__)
+
+
+# Command-line options that must be handled by the client's own process
+LOCAL_ONLY_OPTIONS = {"--debugger", "--profile"}
+
+
+def get_socket_path():
+    if constants.DAEMON_SOCKET:
+        return constants.DAEMON_SOCKET
+
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return os.path.join(runtime_dir, "jirafs.sock")
+    return cache.get_cache_path("daemon.sock")
+
+
+def get_environment():
+    """Return the environment variables that alter Jirafs' behavior."""
+    return {
+        key: value
+        for key, value in os.environ.items()
+        if key.startswith("JIRAFS_") and key != "JIRAFS_NO_DAEMON"
+    }
+
+
+def has_stored_credentials(config):
+    """Return whether Jira credentials are stored in ``config``.
+
+    Commands are run in the daemon only if connecting to Jira will not
+    require asking for a server, username or password (see
+    ``utils.get_jira``).
+
+    """
+    if not config.has_option(constants.CONFIG_JIRA, "server"):
+        return False
+
+    sections = [
+        section
+        for section in config.sections()
+        if config.has_option(section, "username")
+    ]
+    return bool(sections) and all(
+        config.has_option(section, "password") for section in sections
+    )
+
+
+def connect(path=None):
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        client.connect(path or get_socket_path())
+    except OSError:
+        client.close()
+        return None
+    return client
+
+
+def send_request(client, request):
+    client.sendall(json.dumps(request).encode("utf-8") + b"\n")
+    for line in client.makefile("r", encoding="utf-8"):
+        yield json.loads(line)
+
+
+def should_forward(argv):
+    if os.environ.get("JIRAFS_NO_DAEMON"):
+        return False
+    if LOCAL_ONLY_OPTIONS & set(argv[1:]):
+        return False
+    return os.path.exists(get_socket_path())
+
+
+def forward(argv, cwd):
+    """Run a command in the daemon; return its exit code.
+
+    Returns ``None`` if the daemon isn't running or can't run the command,
+    in which case the caller should run the command itself.
+
+    """
+    client = connect()
+    if client is None:
+        return None
+
+    request = {
+        "action": "run",
+        "argv": argv,
+        "cwd": cwd,
+        "version": __version__,
+        "environment": get_environment(),
+    }
+    received = False
+    try:
+        for message in send_request(client, request):
+            received = True
+            if "stdout" in message:
+                sys.stdout.write(message["stdout"])
+                sys.stdout.flush()
+            elif "stderr" in message:
+                sys.stderr.write(message["stderr"])
+                sys.stderr.flush()
+            elif "fallback" in message:
+                return None
+            elif "exit" in message:
+                return message["exit"]
+    except (OSError, ValueError):
+        pass
+    finally:
+        client.close()
+
+    if not received:
+        return None
+    sys.stderr.write("Lost connection to the Jirafs daemon.\n")
+    return 1
+
+
+class RedirectedStream(io.TextIOBase):
+    """Sends output to the current request's client, if there is one."""
+
+    def __init__(self, original, name):
+        self.original = original
+        self.name = name
+        self.target = None
+
+    def write(self, data):
+        target = self.target
+        if target is None:
+            return self.original.write(data)
+        if data:
+            target({self.name: data})
+        return len(data)
+
+    def flush(self):
+        if self.target is None:
+            self.original.flush()
+
+    def isatty(self):
+        return False
+
+
+class RequestHandler(socketserver.StreamRequestHandler):
+    def send(self, message):
+        self.wfile.write(json.dumps(message).encode("utf-8") + b"\n")
+        self.wfile.flush()
+
+    def handle(self):
+        try:
+            request = json.loads(self.rfile.readline().decode("utf-8"))
+        except ValueError:
+            return
+
+        action = request.get("action")
+        try:
+            if action == "status":
+                self.send(
+                    {
+                        "pid": os.getpid(),
+                        "version": __version__,
+                        "started": self.server.started,
+                        "commands": self.server.commands_run,
+                    }
+                )
+            elif action == "stop":
+                self.send({"exit": 0})
+                threading.Thread(target=self.server.shutdown).start()
+            elif action == "run":
+                self.send(self.server.run_command(request, self.send))
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+class DaemonServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path):
+        self.path = path
+        self.started = time.time()
+        self.commands_run = 0
+        self.run_lock = threading.Lock()
+        self.stdout = RedirectedStream(sys.stdout, "stdout")
+        self.stderr = RedirectedStream(sys.stderr, "stderr")
+
+        old_umask = os.umask(0o077)
+        try:
+            super(DaemonServer, self).__init__(path, RequestHandler)
+        finally:
+            os.umask(old_umask)
+
+    def can_run(self, request, command_name):
+        from . import utils
+
+        if request.get("version") != __version__:
+            return False
+        if request.get("environment", {}) != get_environment():
+            return False
+
+        commands = utils.get_installed_commands()
+        if command_name not in commands:
+            # Let the client display the usual usage error.
+            return False
+        if not getattr(commands[command_name], "RUN_IN_DAEMON", True):
+            return False
+        return has_stored_credentials(utils.get_config())
+
+    def run_command(self, request, send):
+        from . import cmdline
+        from .exceptions import UserInputDisabled
+
+        argv = request["argv"]
+        command_name = next((arg for arg in argv[1:] if not arg.startswith("-")), None)
+        if not self.can_run(request, command_name):
+            return {"fallback": True}
+
+        sent = threading.Event()
+
+        def relay(message):
+            sent.set()
+            send(message)
+
+        with self.run_lock:
+            self.commands_run += 1
+            original_argv = sys.argv
+            original_cwd = os.getcwd()
+            self.stdout.target = relay
+            self.stderr.target = relay
+            exit_code = 0
+            try:
+                os.chdir(request["cwd"])
+                sys.argv = argv
+                cmdline.run()
+            except SystemExit as e:
+                if isinstance(e.code, int) or e.code is None:
+                    exit_code = e.code or 0
+                else:
+                    sys.stderr.write("%s\n" % e.code)
+                    exit_code = 1
+            except UserInputDisabled:
+                # Once output has been sent, the command has done work
+                # that running it again in the client would repeat.
+                if not sent.is_set():
+                    return {"fallback": True}
+                sys.stderr.write(
+                    "This command needs input, which the Jirafs daemon "
+                    "cannot ask for; run it with JIRAFS_NO_DAEMON set.\n"
+                )
+                exit_code = 1
+            except Exception:
+                logger.exception("Unhandled error running %s", argv)
+                exit_code = 1
+            finally:
+                self.stdout.target = None
+                self.stderr.target = None
+                sys.argv = original_argv
+                os.chdir(original_cwd)
+
+        return {"exit": exit_code}
+
+    def serve(self):
+        sys.stdout = self.stdout
+        sys.stderr = self.stderr
+        # There is nobody to answer prompts; commands needing input
+        # are handed back to the client.
+        constants.ALLOW_USER_INPUT = False
+        # Subfolder commands started by the daemon must not wait on it.
+        os.environ["JIRAFS_NO_DAEMON"] = "1"
+        try:
+            self.serve_forever()
+        finally:
+            sys.stdout = self.stdout.original
+            sys.stderr = self.stderr.original
+            self.server_close()
+            try:
+                os.unlink(self.path)
+            except OSError:
+                pass
+
+
+def create_server(path=None):
+    path = path or get_socket_path()
+
+    client = connect(path)
+    if client is not None:
+        client.close()
+        raise RuntimeError("A Jirafs daemon is already listening on %s" % path)
+    elif os.path.exists(path):
+        # Left behind by a daemon that did not exit cleanly.
+        os.unlink(path)
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return DaemonServer(path)
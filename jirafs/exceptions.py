@@ -11,6 +11,10 @@ class NotTicketFolderException(JirafsError):
     pass
 
 
+class UserInputDisabled(RuntimeError):
+    pass
+
+
 class LocalCopyOutOfDate(JirafsError):
     pass
 
@@ -0,0 +1,162 @@
+"""An on-disk cache for Jira's read-mostly API endpoints.
+
+Responses from the endpoints listed in ``CACHED_ENDPOINTS`` -- field
+definitions, issue link types, user searches and server information --
+are stored in Jirafs' cache directory, keyed by URL and by
+a hash of the credentials used to request them.  A cached response is
+used without contacting Jira until its endpoint's time-to-live expires;
+after that it is revalidated using ``If-None-Match`` and
+``If-Modified-Since``, so an unchanged response costs only a
+``304 Not Modified``.
+
+Any other request to a URL discards the responses cached for it.
+Responses describing a single issue (like its available transitions) are
+not cached: they are changed by requests to other URLs -- including ones
+naming the issue by its id rather than its key.
+
+"""
+import base64
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+import time
+from urllib import parse
+
+from requests.models import Response
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from . import cache
+from .scheduler import SchedulingAdapter
+
+# (pattern matching the request path, seconds to use without revalidating)
+CACHED_ENDPOINTS = [
+    (re.compile(r"/rest/api/\d+/field/?$"), 60 * 60),
+    (re.compile(r"/rest/api/\d+/issueLinkType/?$"), 24 * 60 * 60),
+    (re.compile(r"/rest/api/\d+/user/search/?$"), 60 * 60),
+    (re.compile(r"/rest/api/\d+/serverInfo/?$"), 24 * 60 * 60),
+]
+
+HTTP_CACHE_DIR = "http"
+
+# Describe the response as it was sent, not the decoded body we store.
+UNCACHED_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+
+
+def get_ttl(url):
+    path = parse.urlparse(url).path
+    for pattern, ttl in CACHED_ENDPOINTS:
+        if pattern.search(path):
+            return ttl
+    return None
+
+
+def get_entry_directory(request):
+    """Return the directory holding all cached responses for a URL's path."""
+    parts = parse.urlparse(request.url)
+    identity = hashlib.sha256(
+        (request.headers.get("Authorization") or "").encode("utf-8")
+    ).hexdigest()
+    path_key = hashlib.sha256(
+        "\0".join([parts.scheme, parts.netloc, parts.path, identity]).encode("utf-8")
+    ).hexdigest()
+    return cache.get_cache_path(HTTP_CACHE_DIR, path_key)
+
+
+def get_entry_path(request):
+    url_key = hashlib.sha256(request.url.encode("utf-8")).hexdigest()
+    return os.path.join(get_entry_directory(request), "%s.json" % url_key)
+
+
+def read_entry(path):
+    try:
+        with open(path, "r", encoding="utf-8") as _in:
+            return json.load(_in)
+    except (IOError, OSError, ValueError):
+        return None
+
+
+def write_entry(path, entry):
+    directory = os.path.dirname(path)
+    try:
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as out:
+                json.dump(entry, out)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+    except (IOError, OSError):
+        pass
+
+
+def build_response(request, entry):
+    response = Response()
+    response.status_code = entry["status"]
+    response.reason = entry.get("reason", "OK")
+    response.headers = CaseInsensitiveDict(entry["headers"])
+    response.encoding = get_encoding_from_headers(response.headers)
+    response.url = request.url
+    response.request = request
+    response._content = base64.b64decode(entry["body"])
+    response._content_consumed = True
+    return response
+
+
+def purge():
+    """Discard every cached response."""
+    shutil.rmtree(cache.get_cache_path(HTTP_CACHE_DIR), ignore_errors=True)
+
+
+class CachingAdapter(SchedulingAdapter):
+    def send(self, request, **kwargs):
+        if request.method.upper() not in ("GET", "HEAD"):
+            shutil.rmtree(get_entry_directory(request), ignore_errors=True)
+            return super(CachingAdapter, self).send(request, **kwargs)
+
+        ttl = get_ttl(request.url)
+        if ttl is None or request.method.upper() != "GET":
+            return super(CachingAdapter, self).send(request, **kwargs)
+
+        path = get_entry_path(request)
+        entry = read_entry(path)
+        if entry is not None:
+            if time.time() - entry["stored"] < ttl:
+                return build_response(request, entry)
+
+            headers = CaseInsensitiveDict(entry["headers"])
+            if "ETag" in headers:
+                request.headers["If-None-Match"] = headers["ETag"]
+            if "Last-Modified" in headers:
+                request.headers["If-Modified-Since"] = headers["Last-Modified"]
+
+        response = super(CachingAdapter, self).send(request, **kwargs)
+
+        if response.status_code == 304 and entry is not None:
+            response.close()
+            entry["stored"] = time.time()
+            write_entry(path, entry)
+            return build_response(request, entry)
+        elif response.status_code == 200:
+            write_entry(
+                path,
+                {
+                    "url": request.url,
+                    "status": response.status_code,
+                    "reason": response.reason,
+                    "headers": {
+                        key: value
+                        for key, value in response.headers.items()
+                        if key.lower() not in UNCACHED_HEADERS
+                    },
+                    "body": base64.b64encode(response.content).decode("ascii"),
+                    "stored": time.time(),
+                },
+            )
+
+        return response
@@ -0,0 +1,63 @@
+"""Compiled matchers for the globs listed in ignore files.
+
+A ticket folder's ignore globs (see ``TicketFolder.get_ignore_globs``)
+are translated into a single regular expression, so a filename is
+checked against all of them in one match.  Compiled matchers are cached
+until one of the files the globs were read from changes.
+
+"""
+import fnmatch
+import os
+import re
+import threading
+
+_matchers = {}
+_matchers_lock = threading.Lock()
+
+
+def compile_globs(globs):
+    """Return a function reporting whether a filename matches any glob."""
+    if not globs:
+        return lambda filename: False
+
+    pattern = re.compile(
+        "|".join("(?:%s)" % fnmatch.translate(os.path.normcase(glob)) for glob in globs)
+    )
+    return lambda filename: pattern.match(os.path.normcase(filename)) is not None
+
+
+def get_stamp(paths):
+    stamp = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            stamp.append((stat.st_mtime_ns, stat.st_size))
+        except OSError:
+            stamp.append(None)
+    return tuple(stamp)
+
+
+def get_matcher(sources, get_globs):
+    """Return a matcher for the globs ``get_globs()`` reads from ``sources``.
+
+    ``get_globs`` is called only if no matcher was compiled for ``sources``,
+    or if one of them has changed since it was.
+
+    """
+    sources = tuple(sources)
+    stamp = get_stamp(sources)
+
+    with _matchers_lock:
+        cached = _matchers.get(sources)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+
+    matcher = compile_globs(get_globs())
+    with _matchers_lock:
+        _matchers[sources] = (stamp, matcher)
+    return matcher
+
+
+def clear():
+    with _matchers_lock:
+        _matchers.clear()
@@ -0,0 +1,129 @@
+"""Reading and writing the cached copy of a ticket's Jira issue.
+
+The issue is cached in ``.jirafs/issue.json`` in one of three formats:
+
+* ``pretty``: indented, key-sorted JSON; easy to read and to diff.
+* ``compact``: a single header line followed by compact JSON.
+* ``binary``: a single header line followed by zlib-compressed JSON.
+
+The header line of the ``compact`` and ``binary`` formats holds the
+handful of values commands need most often (the issue's key, API URL,
+permalink, last-updated time and attachment list) so they can be read
+without decoding the full -- often very large -- issue payload.
+
+"""
+import json
+import zlib
+
+MAGIC = b"JIRAFS-ISSUE"
+VERSION = 1
+
+FORMAT_PRETTY = "pretty"
+FORMAT_COMPACT = "compact"
+FORMAT_BINARY = "binary"
+FORMATS = (FORMAT_PRETTY, FORMAT_COMPACT, FORMAT_BINARY)
+
+
+def build_header(options, raw):
+    fields = raw.get("fields") or {}
+    return {
+        "key": raw.get("key"),
+        "self": raw.get("self"),
+        "updated": fields.get("updated"),
+        "permalink": "{server}/browse/{key}".format(
+            server=options.get("server", ""), key=raw.get("key")
+        ),
+        "attachments": [
+            {
+                "id": attachment.get("id"),
+                "filename": attachment.get("filename"),
+                "created": attachment.get("created"),
+                "size": attachment.get("size"),
+            }
+            for attachment in fields.get("attachment") or []
+        ],
+    }
+
+
+def dumps(options, raw, format=FORMAT_PRETTY):
+    """Return the bytes to store for an issue in the requested format."""
+    storable = {"options": options, "raw": raw}
+
+    if format == FORMAT_PRETTY:
+        return json.dumps(
+            storable,
+            indent=4,
+            sort_keys=True,
+            ensure_ascii=False,
+        ).encode("utf-8")
+    elif format not in FORMATS:
+        raise ValueError(
+            "Unknown issue cache format '%s'; expected one of: %s"
+            % (format, ", ".join(FORMATS))
+        )
+
+    payload = json.dumps(
+        storable,
+        separators=(",", ":"),
+        ensure_ascii=False,
+    ).encode("utf-8")
+    if format == FORMAT_BINARY:
+        payload = zlib.compress(payload)
+
+    header = json.dumps(build_header(options, raw), separators=(",", ":"))
+    return (
+        b" ".join(
+            [
+                MAGIC,
+                str(VERSION).encode("ascii"),
+                format.encode("ascii"),
+                header.encode("ascii"),
+            ]
+        )
+        + b"\n"
+        + payload
+    )
+
+
+def parse_header_line(line):
+    """Return ``(format, header)`` for a header line, or ``None``."""
+    if not line.startswith(MAGIC + b" "):
+        return None
+
+    _, version, format, header = line.rstrip(b"\n").split(b" ", 3)
+    if int(version) > VERSION:
+        raise ValueError("Unsupported issue cache version %s" % version)
+    return format.decode("ascii"), json.loads(header.decode("ascii"))
+
+
+def loads(data):
+    """Return ``(header, storable)`` for stored issue bytes of any format."""
+    parsed = None
+    if data.startswith(MAGIC):
+        line, _, payload = data.partition(b"\n")
+        parsed = parse_header_line(line + b"\n")
+
+    if parsed is None:
+        storable = json.loads(data.decode("utf-8"))
+        return build_header(storable["options"], storable["raw"]), storable
+
+    format, header = parsed
+    if format == FORMAT_BINARY:
+        payload = zlib.decompress(payload)
+    return header, json.loads(payload.decode("utf-8"))
+
+
+def load_header(path):
+    """Return the header for the issue cached at ``path``.
+
+    For the ``compact`` and ``binary`` formats only the first line of
+    the file is read; the ``pretty`` format must be decoded in full.
+
+    """
+    with open(path, "rb") as _in:
+        parsed = parse_header_line(_in.readline())
+        if parsed is not None:
+            return parsed[1]
+
+        _in.seek(0)
+        return loads(_in.read())[0]
@@ -5,13 +5,64 @@ import shutil
 import subprocess
 from urllib import parse
 
-from . import utils
+from . import constants, utils
 from .exceptions import GitCommandError
 
+# Migrations to versions after this one neither merge nor re-clone
+# repositories, so they can be applied together: within a single stash
+# scope, recording the final version in a single commit.
+BATCHED_AFTER_VERSION = 11
 
-def set_repo_version(repo, version):
+
+def get_migration(version):
+    """Return the migration upgrading a folder to ``version``."""
+    return globals()["migration_%s" % str(version).zfill(4)]
+
+
+def plan_migrations(current_version):
+    """Return lists of migrations to apply singly, and as a batch."""
+    single = []
+    batched = []
+    for version in range(current_version + 1, constants.CURRENT_REPO_VERSION + 1):
+        if version <= BATCHED_AFTER_VERSION:
+            single.append(get_migration(version))
+        else:
+            batched.append(get_migration(version))
+    return single, batched
+
+
+class VersionBatch(object):
+    """Records the version changes of several migrations in one commit.
+
+    Used as a context manager; each migration applied within the context
+    is given the batch (as ``batch``), and passes it on to
+    ``set_repo_version``.  The last version set is committed when the
+    context exits.
+
+    """
+
+    def __init__(self, repo):
+        self.repo = repo
+        self.version = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.version is not None:
+            _commit_repo_version(self.repo, self.version)
+
+
+def set_repo_version(repo, version, batch=None):
     with open(repo.get_metadata_path("version"), "w") as out:
         out.write(str(version))
+    if batch is not None:
+        batch.version = version
+        return
+    _commit_repo_version(repo, version)
+
+
+def _commit_repo_version(repo, version):
     repo.run_git_command(
         "add",
         "-f",
@@ -23,8 +74,16 @@ def set_repo_version(repo, version):
     )
 
 
-def migration_0002(repo, **kwargs):
+def migration_0002(repo, init=False, **kwargs):
     """Creates shadow repository used for storing remote values"""
+    if init:
+        # New folders are migrated straight past migration_0018, which
+        # removes the shadow repository again; record remote values
+        # directly onto the 'jira' branch (see ``ShadowTree``) instead.
+        repo.run_git_command("branch", "jira")
+        set_repo_version(repo, 2)
+        return
+
     os.mkdir(repo.get_metadata_path("shadow"))
     subprocess.check_call(
         ("git", "clone", "-q", "../git", "."),
@@ -49,11 +108,6 @@ def migration_0003(repo, init=False, **kwargs):
        copy using an absolute path.
 
     """
-    try:
-        os.mkdir(repo.get_shadow_path(".jirafs"))
-    except OSError:
-        pass
-
     options = copy.copy(repo.issue._options)
     if "default_batch_size" in options:
         # This will have classes as keys, which will cause everything
@@ -61,8 +115,22 @@ def migration_0003(repo, init=False, **kwargs):
         options.pop("default_batch_size")
 
     storable = {"options": options, "raw": repo.issue.raw}
+    content = json.dumps(storable, default=lambda x: str(x))
+
+    if init:
+        repo.shadow.write(".jirafs/issue.json", content)
+        repo.shadow.commit("Completing migration_0003")
+        repo.run_git_command("merge", "jira")
+        set_repo_version(repo, 3)
+        return
+
+    try:
+        os.mkdir(repo.get_shadow_path(".jirafs"))
+    except OSError:
+        pass
+
     with open(repo.get_shadow_path(".jirafs/issue.json"), "w") as out:
-        out.write(json.dumps(storable, default=lambda x: str(x)))
+        out.write(content)
     issue_pickle_path = repo.get_shadow_path(".jirafs/issue.json")
     repo.run_git_command("add", "-f", issue_pickle_path, shadow=True)
     repo.run_git_command("commit", "-m", "Completing migration_0003", shadow=True)
@@ -71,9 +139,17 @@ def migration_0003(repo, init=False, **kwargs):
     set_repo_version(repo, 3)
 
 
-def migration_0004(repo, **kwargs):
+def migration_0004(repo, init=False, **kwargs):
     """Moves remote_files.json into version control."""
     local_remote_files_path = repo.get_metadata_path("remote_files.json")
+
+    if init:
+        repo.shadow.write(".jirafs/remote_files.json", "{}")
+        repo.shadow.commit("Completing migration_0004")
+        repo.run_git_command("merge", "jira")
+        set_repo_version(repo, 4)
+        return
+
     jira_remote_files_path = repo.get_shadow_path(".jirafs/remote_files.json")
     try:
         os.rename(local_remote_files_path, jira_remote_files_path)
@@ -208,6 +284,7 @@ def migration_0009(repo, init=False, **kwargs):
     """Re-clone shadow copy so it does not reference an absolute path."""
     if init:
         set_repo_version(repo, 9)
+        return
 
     shutil.rmtree(repo.get_metadata_path("shadow"))
     os.mkdir(repo.get_metadata_path("shadow"))
@@ -304,8 +381,12 @@ def migration_0011(repo, init=False, **kwargs):
     set_repo_version(repo, 11)
 
 
-def migration_0012(repo, init=False, **kwargs):
+def migration_0012(repo, init=False, batch=None, **kwargs):
     """Force the shadow repository to use a relative URL."""
+    if init:
+        set_repo_version(repo, 12, batch=batch)
+        return
+
     subprocess.check_call(
         ("git", "remote", "set-url", "origin", "../git"),
         cwd=repo.get_metadata_path("shadow"),
@@ -313,18 +394,18 @@ def migration_0012(repo, init=False, **kwargs):
         stderr=subprocess.PIPE,
     )
 
-    set_repo_version(repo, 12)
+    set_repo_version(repo, 12, batch=batch)
 
 
-def migration_0013(repo, init=False, **kwargs):
+def migration_0013(repo, init=False, batch=None, **kwargs):
     """Ensure that folder URL is written to issue_url file."""
     if init:
-        set_repo_version(repo, 13)
+        set_repo_version(repo, 13, batch=batch)
         return
 
     result = repo.get_ticket_url()
     if result is not None:
-        set_repo_version(repo, 13)
+        set_repo_version(repo, 13, batch=batch)
         return
 
     jira_base = utils.get_default_jira_server()
@@ -337,12 +418,12 @@ def migration_0013(repo, init=False, **kwargs):
     with open(repo.get_metadata_path("issue_url", "w")) as out:
         out.write(issue_url)
 
-    set_repo_version(repo, 13)
+    set_repo_version(repo, 13, batch=batch)
 
 
-def migration_0014(repo, init=False, **kwargs):
+def migration_0014(repo, init=False, batch=None, **kwargs):
     if init:
-        set_repo_version(repo, 14)
+        set_repo_version(repo, 14, batch=batch)
         return
 
     with open(repo.get_metadata_path("git/info/exclude"), "w") as out:
@@ -391,15 +472,15 @@ def migration_0014(repo, init=False, **kwargs):
         "commit", "-m", "Completing migration_0014", failure_ok=True, shadow=True
     )
 
-    set_repo_version(repo, 14)
+    set_repo_version(repo, 14, batch=batch)
 
 
-def migration_0015(repo, init=False, **kwargs):
+def migration_0015(repo, init=False, batch=None, **kwargs):
     """No-op; was previously something else."""
-    set_repo_version(repo, 15)
+    set_repo_version(repo, 15, batch=batch)
 
 
-def migration_0016(repo, init=False, **kwargs):
+def migration_0016(repo, init=False, batch=None, **kwargs):
     """Add the 'macros_applied.patch' file to the repository."""
     macro_path = repo.get_metadata_path("macros_applied.patch")
     if not os.path.exists(macro_path):
@@ -409,10 +490,28 @@ def migration_0016(repo, init=False, **kwargs):
     repo.run_git_command("add", "-f", macro_path)
     repo.run_git_command("commit", "-m", "Completing migration_0015", failure_ok=True)
 
-    set_repo_version(repo, 16)
+    set_repo_version(repo, 16, batch=batch)
 
 
-def migration_0017(repo, init=False, **kwargs):
+def migration_0017(repo, init=False, batch=None, **kwargs):
     """Set initial branch name if not set."""
     repo.run_git_command("config", "init.defaultBranch", "master")
-    set_repo_version(repo, 17)
+    set_repo_version(repo, 17, batch=batch)
+
+
+def migration_0018(repo, init=False, batch=None, **kwargs):
+    """Remove the shadow repository.
+
+    Remote changes are now committed directly onto the 'jira' branch of
+    the ticket folder's repository, so the separate clone previously
+    used for staging them is no longer necessary.
+
+    """
+    shadow_path = repo.get_metadata_path("shadow")
+    if os.path.isdir(shadow_path):
+        # Anything committed to the shadow copy but not yet pushed
+        # would otherwise be lost.
+        repo.run_git_command("push", "origin", "jira", failure_ok=True, shadow=True)
+        shutil.rmtree(shadow_path)
+
+    set_repo_version(repo, 18, batch=batch)
@@ -0,0 +1,146 @@
+"""Handlers writing each ticket folder's operation log.
+
+Ticket folders share one ``RotatingFileHandler`` per log file: ``acquire``
+attaches the file's handler to the ticket's logger when it is first
+needed, and ``release`` detaches and closes it once the last folder using
+it is finished, so a process touching many folders holds open only the
+logs of folders that are still in use.
+
+If ``constants.ASYNC_OPERATION_LOG`` is set, records are instead placed on
+a queue and written to the log files by a single background thread, so
+writing to a log never delays the operation being logged.
+
+"""
+import atexit
+import logging
+import logging.handlers
+import queue
+import threading
+
+from . import constants
+
+FORMAT = "%(asctime)s\t%(levelname)s\t%(module)s\t%(message)s"
+MAX_BYTES = 2**20
+BACKUP_COUNT = 2
+
+
+def create_file_handler(path):
+    handler = logging.handlers.RotatingFileHandler(
+        path,
+        maxBytes=MAX_BYTES,
+        backupCount=BACKUP_COUNT,
+        encoding="utf-8",
+        delay=True,
+    )
+    handler.setFormatter(logging.Formatter(fmt=FORMAT))
+    return handler
+
+
+class OperationLogQueueHandler(logging.handlers.QueueHandler):
+    """Queues records, noting the log file they should be written to."""
+
+    def __init__(self, log_queue, path):
+        super(OperationLogQueueHandler, self).__init__(log_queue)
+        self.path = path
+
+    def prepare(self, record):
+        record = super(OperationLogQueueHandler, self).prepare(record)
+        record.operation_log = self.path
+        return record
+
+    def close(self):
+        # Close the file only once records queued before now are written.
+        self.enqueue(
+            logging.makeLogRecord({"operation_log": self.path, "close_log": True})
+        )
+        super(OperationLogQueueHandler, self).close()
+
+
+class OperationLogDispatcher(logging.Handler):
+    """Writes queued records to their log files; runs on the listener thread."""
+
+    def __init__(self):
+        super(OperationLogDispatcher, self).__init__()
+        self.handlers = {}
+
+    def handle(self, record):
+        path = record.operation_log
+        if getattr(record, "close_log", False):
+            handler = self.handlers.pop(path, None)
+            if handler is not None:
+                handler.close()
+            return
+
+        if path not in self.handlers:
+            self.handlers[path] = create_file_handler(path)
+        self.handlers[path].handle(record)
+
+    def close(self):
+        for handler in self.handlers.values():
+            handler.close()
+        self.handlers.clear()
+        super(OperationLogDispatcher, self).close()
+
+
+_handlers = {}
+_handlers_lock = threading.Lock()
+_listener = None
+
+
+def get_queue():
+    global _listener
+
+    if _listener is None:
+        _listener = logging.handlers.QueueListener(
+            queue.SimpleQueue(), OperationLogDispatcher()
+        )
+        _listener.start()
+        atexit.register(stop_listener)
+    return _listener.queue
+
+
+def stop_listener():
+    """Write any queued records and stop the background writer."""
+    global _listener
+
+    with _handlers_lock:
+        listener, _listener = _listener, None
+    if listener is not None:
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+
+
+def acquire(logger, path):
+    """Attach the handler for the log at ``path`` to ``logger``."""
+    with _handlers_lock:
+        if path in _handlers:
+            _handlers[path][1] += 1
+            return
+
+        if constants.ASYNC_OPERATION_LOG:
+            handler = OperationLogQueueHandler(get_queue(), path)
+        else:
+            handler = create_file_handler(path)
+        logger.addHandler(handler)
+        _handlers[path] = [handler, 1]
+
+
+def release(logger, path):
+    """Detach and close the log's handler once no folder is using it."""
+    with _handlers_lock:
+        if path not in _handlers:
+            return
+
+        _handlers[path][1] -= 1
+        if _handlers[path][1] > 0:
+            return
+
+        handler, _ = _handlers.pop(path)
+        logger.removeHandler(handler)
+        handler.close()
+
+
+def get_open_logs():
+    with _handlers_lock:
+        return {path: count for path, (_, count) in _handlers.items()}
@@ -0,0 +1,127 @@
+"""Where command results are written.
+
+Commands return their output as a ``CommandResult``; the output channel
+writes each ticket folder's result as soon as it is available -- when a
+command runs for subtasks (or, from outside a ticket folder, for each
+ticket folder in the current directory), each folder's result is
+written as that folder finishes rather than when the whole run does.
+
+Two formats are available (see ``jirafs --output-format``):
+
+* ``text`` (the default): results are written as they are displayed.
+* ``ndjson``: each result is written as a single line of JSON::
+
+      {"type": "result", "command": "pull", "folder": "/path/ALPHA-123",
+       "ticket": "ALPHA-123", "return_code": 0, "output": "..."}
+
+  Errors that end a command are written as ``"type": "error"`` records
+  with ``exit_code`` and ``error`` in place of ``return_code`` and
+  ``output``.  Anything else -- log messages, and anything a command
+  prints directly -- is written to stderr, so stdout holds only records.
+
+"""
+import json
+import re
+import sys
+import threading
+
+from . import constants
+
+TEXT = "text"
+NDJSON = "ndjson"
+FORMATS = (TEXT, NDJSON)
+
+ANSI_ESCAPE = re.compile(r"\x1b(?:\[[0-9;?]*[A-Za-z]|\([A-Za-z0-9])")
+
+
+def strip_formatting(string):
+    return ANSI_ESCAPE.sub("", string)
+
+
+class OutputChannel(object):
+    def __init__(self, format=TEXT, stream=None):
+        if format not in FORMATS:
+            raise ValueError("Unknown output format: %s" % format)
+        self.format = format
+        self.stream = stream
+        self.lock = threading.Lock()
+        self._stdout = None
+
+    @property
+    def structured(self):
+        return self.format == NDJSON
+
+    def get_stream(self):
+        return self.stream if self.stream is not None else sys.stdout
+
+    def start(self):
+        """Send anything else written to stdout to stderr, if structured."""
+        self.stream = sys.stdout
+        if self.structured:
+            self._stdout = sys.stdout
+            sys.stdout = sys.stderr
+
+    def stop(self):
+        if self._stdout is not None:
+            sys.stdout = self._stdout
+            self._stdout = None
+
+    def write_record(self, record):
+        stream = self.get_stream()
+        with self.lock:
+            stream.write(json.dumps(record, sort_keys=True) + "\n")
+            stream.flush()
+
+    def result(self, result, command, folder, ticket=None):
+        """Write the part of ``result`` not yet written."""
+        if not self.structured:
+            result.echo()
+            return
+
+        # A folder whose result was partly written already gets a
+        # second record only if there is more to say.
+        if result.cursor and result.cursor >= len(result):
+            return
+        output = result[result.cursor :]
+        result.cursor = len(result)
+        self.write_record(
+            {
+                "type": "result",
+                "command": command,
+                "folder": folder,
+                "ticket": ticket,
+                "return_code": result.return_code,
+                "output": strip_formatting(output),
+            }
+        )
+
+    def error(self, exit_code, error, command, folder):
+        if not self.structured:
+            return
+
+        self.write_record(
+            {
+                "type": "error",
+                "command": command,
+                "folder": folder,
+                "exit_code": exit_code,
+                "error": strip_formatting(str(error)),
+            }
+        )
+
+
+_channel = OutputChannel()
+
+
+def get_channel():
+    return _channel
+
+
+def set_format(format=None):
+    """Replace the output channel with one writing ``format``."""
+    global _channel
+
+    if format is None:
+        format = constants.OUTPUT_FORMAT
+    _channel = OutputChannel(format)
+    return _channel
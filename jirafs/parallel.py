@@ -0,0 +1,126 @@
+"""Run work for many ticket folders at once, keeping output in order.
+
+``run_in_order`` runs a function for each of a list of items on a bounded
+pool of worker threads.  Anything a worker prints (or logs to the
+console) is captured, and each item's output is printed -- in the order
+of the items, not the order in which they finish -- as soon as it and
+every item before it are finished.
+
+"""
+import collections
+import concurrent.futures
+import contextlib
+import io
+import logging
+import sys
+import threading
+
+from . import constants
+
+ItemResult = collections.namedtuple("ItemResult", ["item", "result", "error"])
+
+
+_local = threading.local()
+_install_lock = threading.Lock()
+_install_count = 0
+_installed = []
+
+
+class ThreadOutput(io.TextIOBase):
+    """Writes to the current thread's capture buffer, if it has one."""
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def write(self, data):
+        buffer = getattr(_local, "buffer", None)
+        if buffer is None:
+            return self.stream.write(data)
+        return buffer.write(data)
+
+    def flush(self):
+        if getattr(_local, "buffer", None) is None:
+            self.stream.flush()
+
+    def isatty(self):
+        return self.stream.isatty()
+
+    def fileno(self):
+        return self.stream.fileno()
+
+
+@contextlib.contextmanager
+def thread_output():
+    """Route output through ``ThreadOutput`` while the context is active.
+
+    ``sys.stdout``, ``sys.stderr`` and the console handlers of the root
+    logger are replaced; nested contexts share the same replacements.
+
+    """
+    global _install_count
+
+    with _install_lock:
+        if _install_count == 0:
+            replaced = {}
+            for name in ("stdout", "stderr"):
+                original = getattr(sys, name)
+                replaced[id(original)] = ThreadOutput(original)
+                _installed.append((sys, name, original))
+                setattr(sys, name, replaced[id(original)])
+            for handler in logging.getLogger().handlers:
+                stream = getattr(handler, "stream", None)
+                if id(stream) in replaced:
+                    _installed.append((handler, "stream", stream))
+                    handler.stream = replaced[id(stream)]
+        _install_count += 1
+    try:
+        yield
+    finally:
+        with _install_lock:
+            _install_count -= 1
+            if _install_count == 0:
+                while _installed:
+                    target, name, original = _installed.pop()
+                    setattr(target, name, original)
+
+
+def call_captured(function, item):
+    previous = getattr(_local, "buffer", None)
+    _local.buffer = io.StringIO()
+    try:
+        try:
+            result = ItemResult(item, function(item), None)
+        except Exception as e:
+            result = ItemResult(item, None, e)
+        return result, _local.buffer.getvalue()
+    finally:
+        _local.buffer = previous
+
+
+def run_in_order(function, items, workers=None):
+    """Call ``function`` for each item; return a list of ``ItemResult``.
+
+    Exceptions raised by ``function`` are returned (as ``error``) rather
+    than raised.
+
+    """
+    items = list(items)
+    if workers is None:
+        workers = constants.SUBTASK_CONCURRENCY
+    workers = max(1, min(workers, len(items)))
+
+    results = []
+    if not items:
+        return results
+
+    with thread_output(), concurrent.futures.ThreadPoolExecutor(
+        max_workers=workers
+    ) as executor:
+        futures = [executor.submit(call_captured, function, item) for item in items]
+        for future in futures:
+            result, output = future.result()
+            sys.stdout.write(output)
+            sys.stdout.flush()
+            results.append(result)
+
+    return results
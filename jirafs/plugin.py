@@ -24,7 +24,7 @@ from typing import (
 
 from blessings import Terminal
 
-from . import __version__, constants
+from . import __version__, constants, output, parallel
 from .exceptions import MacroAttributeError, MacroContentError, MacroError
 from .types import JirafsMacroAttributes
 
@@ -68,6 +68,32 @@ class MacroResult(str):
         return self._generated_filenames
 
 
+_terminal = None
+
+
+def get_terminal():
+    """Return a ``Terminal`` shared by all command output."""
+    global _terminal
+
+    if _terminal is None:
+        _terminal = Terminal()
+    return _terminal
+
+
+def format_output(string, terminal, **kwargs):
+    kwargs["t"] = terminal
+    try:
+        return string.format(**kwargs)
+    except KeyError:
+        logger.warning(
+            "An error was encountered while attempting to format "
+            "string; returning the original string unformatted. "
+            "The caller may want to use the 'no_format' option if "
+            "the outgoing string includes curly braces.",
+        )
+        return string
+
+
 class CommandResult(str):
     _return_code: Optional[int] = None
     terminal: Optional[Terminal] = None
@@ -81,18 +107,9 @@ class CommandResult(str):
         if string and not string.endswith("\n"):
             string = string + "\n"
 
-        terminal = Terminal()
+        terminal = get_terminal()
         if not no_format:
-            kwargs["t"] = terminal
-            try:
-                string = string.format(**kwargs)
-            except KeyError:
-                logger.warning(
-                    "An error was encountered while attempting to format "
-                    "string; returning the original string unformatted. "
-                    "The caller may want to use the 'no_format' option if "
-                    "the outgoing string includes curly braces.",
-                )
+            string = format_output(string, terminal, **kwargs)
 
         self = str.__new__(cls, string)
         self._return_code = return_code
@@ -115,18 +132,9 @@ class CommandResult(str):
             the_line = the_line + "\n"
 
         if not no_format:
-            kwargs["t"] = self.terminal
-            try:
-                the_line = the_line.format(**kwargs)
-            except KeyError:
-                logger.warning(
-                    "An error was encountered while attempting to format "
-                    "string; returning the original string unformatted. "
-                    "The caller may want to use the 'no_format' option if "
-                    "the outgoing string includes curly braces.",
-                )
+            the_line = format_output(the_line, self.terminal, **kwargs)
 
-        new_result = CommandResult(the_line, no_format=no_format)
+        new_result = CommandResult(the_line, no_format=True)
         return self + new_result
 
     def __add__(self, other):
@@ -151,6 +159,67 @@ class CommandResult(str):
         self._return_code = int(value) if value is not None else None
 
 
+class CommandResultBuilder(object):
+    """Collects command output line by line; see ``CommandResult``.
+
+    Lines are held as a list of formatted segments and joined only when
+    the result is built, so output of any length is built in linear time.
+    ``echo`` writes any lines not yet written, so output can be streamed
+    as it is collected.  ``add_line`` returns the builder itself, so code
+    written for ``CommandResult`` (``result = result.add_line(...)``)
+    works unchanged.
+
+    """
+
+    def __init__(self, string=None, return_code=None, no_format=False, **kwargs):
+        self.terminal = get_terminal()
+        self.segments = []
+        self.echoed = 0
+        self.echoed_length = 0
+        self.return_code = return_code
+
+        if string:
+            self.add_line(string, no_format=no_format, **kwargs)
+
+    def __len__(self):
+        return sum(len(segment) for segment in self.segments)
+
+    def __str__(self):
+        return "".join(self.segments)
+
+    def add_line(self, the_line: str, no_format: bool = False, **kwargs):
+        if not the_line.endswith("\n"):
+            the_line = the_line + "\n"
+
+        if not no_format:
+            the_line = format_output(the_line, self.terminal, **kwargs)
+
+        self.segments.append(the_line)
+        return self
+
+    def _echo(self, message: str) -> None:
+        print(message, end="")
+
+    def echo(self):
+        pending = self.segments[self.echoed :]
+        if pending:
+            message = "".join(pending)
+            self._echo(message)
+            self.echoed = len(self.segments)
+            self.echoed_length += len(message)
+
+        return self
+
+    def build(self) -> CommandResult:
+        """Return the collected output as a ``CommandResult``."""
+        return CommandResult(
+            str(self),
+            return_code=self.return_code,
+            cursor=self.echoed_length,
+            no_format=True,
+        )
+
+
 class JirafsPluginBase(object):
     MIN_VERSION: Optional[str] = None
     MAX_VERSION: Optional[str] = None
@@ -272,7 +341,9 @@ class CommandPlugin(JirafsPluginBase):
 
     @classmethod
     def get_command_result(cls, result, original=None):
-        if not isinstance(result, CommandResult):
+        if isinstance(result, CommandResultBuilder):
+            result = result.build()
+        elif not isinstance(result, CommandResult):
             result = CommandResult(result)
 
         if original is not None:
@@ -300,49 +371,95 @@ class CommandPlugin(JirafsPluginBase):
         folder = None
         folder_plugins = []
         if cmd.auto_instantiate_folder():
-            folder = TicketFolder(path, jira, migrate=args.migrate)
+            folder = TicketFolder(
+                path, jira, migrate=args.migrate, lazy=cmd.lazy_folder()
+            )
             folder_plugins = folder.plugins
 
-        kwargs = {
-            "args": args,
-            "folder": folder,
-            "jira": jira,
-            "path": path,
-            "parser": parser,
-        }
-        pre_method = "pre_%s" % command_name
-        post_method = "post_%s" % command_name
-        for plugin in folder_plugins:
-            if not hasattr(plugin, pre_method):
-                continue
-            method = getattr(plugin, pre_method)
-            result = method(**kwargs)
-            if result is not None:
-                kwargs = result
+        try:
+            kwargs = {
+                "args": args,
+                "folder": folder,
+                "jira": jira,
+                "path": path,
+                "parser": parser,
+            }
+            pre_method = "pre_%s" % command_name
+            post_method = "post_%s" % command_name
+            for plugin in folder_plugins:
+                if not hasattr(plugin, pre_method):
+                    continue
+                method = getattr(plugin, pre_method)
+                result = method(**kwargs)
+                if result is not None:
+                    kwargs = result
 
-        cmd.validate(**kwargs)
-        result = cls.get_command_result(cmd.handle(**kwargs))
+            cmd.validate(**kwargs)
+            result = cls.get_command_result(cmd.handle(**kwargs))
 
-        for plugin in folder_plugins:
-            if not hasattr(plugin, post_method):
+            for plugin in folder_plugins:
+                if not hasattr(plugin, post_method):
+                    continue
+                method = getattr(plugin, post_method)
+                post_result = method(result)
+                if post_result is not None:
+                    result = cls.get_command_result(post_result, original=result)
+
+            if getattr(cls, "RUN_FOR_SUBTASKS", False):
+                result = cls.execute_for_subtasks(
+                    result, folder, extra_args, jira, command_name, **ckwargs
+                )
+
+            return result
+        finally:
+            if folder is not None:
+                folder.close()
+
+    @classmethod
+    def execute_for_subtasks(
+        cls, result, folder, extra_args, jira, command_name, **ckwargs
+    ):
+        """Run this command for each of ``folder``'s subtasks concurrently.
+
+        ``result`` (so far) and each subtask's result are written to the
+        output channel as soon as they are available.  Returns ``result``
+        with a line added for each subtask for which the command failed.
+
+        """
+        subtasks = folder.subtask_descriptors
+        if not subtasks:
+            return result
+
+        channel = output.get_channel()
+        channel.result(result, command_name, folder.path, folder.ticket_number)
+
+        def execute(subtask):
+            try:
+                subtask_result = cls.execute_command(
+                    extra_args, jira, subtask.path, command_name, **ckwargs
+                )
+            except Exception as e:
+                logger.exception(
+                    "Exception encountered while running "
+                    "'%s' for ticket subfolder '%s': %s"
+                    % (command_name, subtask.key, e)
+                )
+                raise
+            channel.result(subtask_result, command_name, subtask.path, subtask.key)
+            return subtask_result
+
+        for item in parallel.run_in_order(execute, subtasks):
+            if item.error is None:
                 continue
-            method = getattr(plugin, post_method)
-            post_result = method(result)
-            if post_result is not None:
-                result = cls.get_command_result(post_result, original=result)
-
-        if getattr(cls, "RUN_FOR_SUBTASKS", False):
-            for subfolder in folder.subtasks:
-                try:
-                    cls.execute_command(
-                        extra_args, jira, subfolder.path, command_name, **ckwargs
-                    )
-                except Exception as e:
-                    logger.exception(
-                        "Exception encountered while running "
-                        "'%s' for ticket subfolder '%s': %s"
-                        % (command_name, subfolder.ticket_number, e)
-                    )
+            result = result.add_line(
+                "{t.red}Could not run '{command}' for subtask {ticket}: "
+                "{error}{t.normal}",
+                command=command_name,
+                ticket=item.item.key,
+                error=item.error,
+            )
+            if not result.return_code:
+                result.return_code = 1
 
         return result
 
@@ -366,6 +483,9 @@ class CommandPlugin(JirafsPluginBase):
             True,
         )
 
+    def lazy_folder(self) -> bool:
+        return getattr(self, "LAZY_FOLDER", False)
+
 
 class DirectOutputCommandPlugin(CommandPlugin):
     def cmd(self, *args, **kwargs):
@@ -0,0 +1,202 @@
+"""Lookup of the commands and plugins installed via entry points.
+
+Scanning every installed distribution for entry points is slow, so the
+table of entry points in the groups Jirafs uses is cached on disk; the
+cache is rebuilt whenever a directory on ``sys.path`` (or the metadata
+of a distribution providing Jirafs entry points) is modified, as happens
+whenever a distribution is installed, upgraded or removed.
+
+Modules providing commands and plugins are not imported until the
+command or plugin is used.
+
+"""
+import collections.abc
+import importlib
+import logging
+import os
+import sys
+
+try:
+    from importlib import metadata as importlib_metadata
+except ImportError:  # Python < 3.8
+    import importlib_metadata
+
+from . import cache
+
+logger = logging.getLogger(__name__)
+
+
+COMMANDS_GROUP = "jirafs_commands"
+PLUGINS_GROUP = "jirafs_plugins"
+GROUPS = (COMMANDS_GROUP, PLUGINS_GROUP)
+
+ENTRY_POINT_CACHE = "entry_points.json"
+
+_entry_point_table = None
+_registries = {}
+
+
+def get_fingerprint(metadata_files):
+    stamps = [sys.version]
+    for path in [p for p in sys.path if p] + metadata_files:
+        try:
+            stamps.append([path, os.stat(path).st_mtime_ns])
+        except OSError:
+            stamps.append([path, None])
+    return stamps
+
+
+def scan_entry_points():
+    """Return ``({group: {name: value}}, metadata_files)`` for ``GROUPS``."""
+    table = {group: {} for group in GROUPS}
+    metadata_files = []
+
+    for distribution in importlib_metadata.distributions():
+        found = False
+        for entry_point in distribution.entry_points:
+            if entry_point.group in table:
+                table[entry_point.group].setdefault(entry_point.name, entry_point.value)
+                found = True
+
+        if found:
+            metadata_files.extend(
+                os.path.abspath(str(path.locate()))
+                for path in distribution.files or []
+                if path.name == "entry_points.txt"
+            )
+
+    return table, metadata_files
+
+
+def get_entry_point_table():
+    """Return ``{group: {name: "module:attribute"}}`` for ``GROUPS``."""
+    global _entry_point_table
+
+    if _entry_point_table is None:
+        cached = cache.read_json_cache(ENTRY_POINT_CACHE, sys.executable)
+        if cached and cached["fingerprint"] == get_fingerprint(
+            cached["metadata_files"]
+        ):
+            _entry_point_table = cached["table"]
+        else:
+            table, metadata_files = scan_entry_points()
+            cache.write_json_cache(
+                ENTRY_POINT_CACHE,
+                sys.executable,
+                {
+                    "fingerprint": get_fingerprint(metadata_files),
+                    "metadata_files": metadata_files,
+                    "table": table,
+                },
+            )
+            _entry_point_table = table
+
+    return _entry_point_table
+
+
+def clear():
+    global _entry_point_table
+
+    _entry_point_table = None
+    _registries.clear()
+
+
+class EntryPointRegistry(collections.abc.Mapping):
+    """A mapping of entry point names to the classes they refer to.
+
+    ``names()`` lists entry point names without importing anything; an
+    entry point's module is imported only when its class is requested.
+    Entry points that cannot be imported, or that do not refer to a
+    subclass of ``base_class``, are logged and treated as missing (see
+    ``get_error``).  Entry points referring to a subclass of
+    ``base_class`` that is not a subclass of ``subclass`` are silently
+    treated as missing.  Iterating over the mapping imports each entry
+    point so that only the names that load are listed.
+
+    """
+
+    def __init__(self, entry_points, base_class, subclass=None):
+        self._entry_points = entry_points
+        self._base_class = base_class
+        self._subclass = subclass or base_class
+        self._loaded = {}
+        self._errors = {}
+
+    def names(self):
+        """Return every entry point name, importing nothing."""
+        return list(self._entry_points)
+
+    def get_error(self, name):
+        """Return why ``name`` could not be loaded, if it could not."""
+        if name not in self._entry_points:
+            return "No entry point named '%s' is installed." % name
+        if self.load(name) is None:
+            return self._errors[name]
+        return None
+
+    def load(self, name):
+        if name not in self._loaded:
+            self._loaded[name] = self._load(name, self._entry_points[name])
+        return self._loaded[name]
+
+    def _load(self, name, value):
+        module_name, _, attribute = value.partition(":")
+        try:
+            loaded_class = importlib.import_module(module_name)
+            for part in attribute.split("."):
+                loaded_class = getattr(loaded_class, part)
+        except (ImportError, AttributeError) as e:
+            self._errors[name] = "Entry point %s = %s could not be imported: %s" % (
+                name,
+                value,
+                e,
+            )
+            logger.warning(
+                "Attempted to load entrypoint %s, but " "an ImportError occurred.",
+                "%s = %s" % (name, value),
+            )
+            return None
+        if not isinstance(loaded_class, type) or not issubclass(
+            loaded_class, self._base_class
+        ):
+            logger.warning(
+                "Loaded entrypoint %s, but loaded class is "
+                "not a subclass of `%s.%s`.",
+                "%s = %s" % (name, value),
+                self._base_class.__module__,
+                self._base_class.__name__,
+            )
+            return None
+        if not issubclass(loaded_class, self._subclass):
+            self._errors[name] = "Entry point %s = %s is not a subclass of %s.%s" % (
+                name,
+                value,
+                self._subclass.__module__,
+                self._subclass.__name__,
+            )
+            return None
+        return loaded_class
+
+    def __getitem__(self, name):
+        loaded_class = self.load(name)
+        if loaded_class is None:
+            raise KeyError(name)
+        return loaded_class
+
+    def __contains__(self, name):
+        return name in self._entry_points and self.load(name) is not None
+
+    def __iter__(self):
+        return iter([name for name in self._entry_points if name in self])
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+
+def get_registry(group, base_class, subclass=None):
+    key = (group, base_class, subclass)
+    if key not in _registries:
+        _registries[key] = EntryPointRegistry(
+            get_entry_point_table().get(group, {}), base_class, subclass=subclass
+        )
+    return _registries[key]
@@ -0,0 +1,210 @@
+"""Rate limiting, adaptive concurrency and retries for requests to Jira.
+
+``SchedulingAdapter`` is mounted on the session of each Jira client (see
+``utils.get_jira``).  Requests to each server share a ``ServerSchedule``:
+
+* a token bucket limits how quickly requests are started;
+* an AIMD (additive-increase, multiplicative-decrease) limit caps how
+  many requests may be in flight at once -- it grows by one after each
+  full window of successful requests, and is halved whenever Jira
+  responds that it is overloaded;
+* a ``Retry-After`` header pauses every request to that server for the
+  requested period.
+
+Requests rejected with ``429 Too Many Requests`` are retried, as are
+idempotent requests that fail with a transient error; each retry waits
+for an exponentially-growing, jittered delay.
+
+"""
+import email.utils
+import logging
+import random
+import threading
+import time
+from urllib import parse
+
+from requests import exceptions as requests_exceptions
+from requests.adapters import HTTPAdapter
+
+from . import constants
+
+logger = logging.getLogger(__name__)
+
+
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+OVERLOADED_STATUSES = {429, 503}
+RETRYABLE_STATUSES = {429, 502, 503, 504}
+
+
+def parse_retry_after(value, now=None):
+    """Return the number of seconds a ``Retry-After`` header asks for."""
+    if not value:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if now is None:
+        now = time.time()
+    return max(0.0, retry_at.timestamp() - now)
+
+
+def get_backoff_delay(attempt):
+    maximum = min(
+        constants.JIRA_RETRY_BACKOFF_MAX,
+        constants.JIRA_RETRY_BACKOFF * (2**attempt),
+    )
+    return random.uniform(maximum / 2, maximum)
+
+
+class ServerSchedule(object):
+    def __init__(self, rate=None, burst=None, concurrency=None, max_concurrency=None):
+        self.rate = rate or constants.JIRA_REQUESTS_PER_SECOND
+        self.burst = burst or constants.JIRA_REQUEST_BURST
+        self.limit = concurrency or constants.JIRA_CONCURRENCY
+        self.max_limit = max_concurrency or constants.JIRA_CONNECTION_POOL_SIZE
+
+        self.tokens = float(self.burst)
+        self.in_flight = 0
+        self.successes = 0
+        self.paused_until = 0.0
+        self.last_decrease = 0.0
+
+        self._updated = time.monotonic()
+        self._condition = threading.Condition()
+
+    def _refill(self, now):
+        self.tokens = min(
+            float(self.burst), self.tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    def acquire(self):
+        """Wait until a request may be started."""
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+
+                if now < self.paused_until:
+                    wait = self.paused_until - now
+                elif self.in_flight >= self.limit:
+                    wait = None
+                elif self.tokens < 1:
+                    wait = (1 - self.tokens) / self.rate
+                else:
+                    self.tokens -= 1
+                    self.in_flight += 1
+                    return
+
+                self._condition.wait(wait)
+
+    def release(self, overloaded=False):
+        """Record the outcome of a request started with ``acquire``."""
+        with self._condition:
+            self.in_flight -= 1
+
+            if overloaded:
+                self.successes = 0
+                now = time.monotonic()
+                # Requests already in flight when Jira became overloaded
+                # will also fail; count those as a single event.
+                if now - self.last_decrease > 1.0:
+                    self.limit = max(1, self.limit // 2)
+                    self.last_decrease = now
+            else:
+                self.successes += 1
+                if self.successes >= self.limit and self.limit < self.max_limit:
+                    self.limit += 1
+                    self.successes = 0
+
+            self._condition.notify_all()
+
+    def pause(self, seconds):
+        with self._condition:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self._condition.notify_all()
+
+
+_schedules = {}
+_schedules_lock = threading.Lock()
+
+
+def get_server_schedule(url):
+    parts = parse.urlparse(url)
+    key = (parts.scheme, parts.netloc)
+    with _schedules_lock:
+        if key not in _schedules:
+            _schedules[key] = ServerSchedule()
+        return _schedules[key]
+
+
+def clear_schedules():
+    with _schedules_lock:
+        _schedules.clear()
+
+
+class SchedulingAdapter(HTTPAdapter):
+    def can_retry(self, request, status=None):
+        if status == 429:
+            # The request was rejected without being processed; it can
+            # be retried so long as its body can be sent again.
+            return request.body is None or isinstance(request.body, (bytes, str))
+        return request.method.upper() in IDEMPOTENT_METHODS
+
+    def send(self, request, **kwargs):
+        schedule = get_server_schedule(request.url)
+        attempt = 0
+
+        while True:
+            schedule.acquire()
+            try:
+                response = super(SchedulingAdapter, self).send(request, **kwargs)
+            except (
+                requests_exceptions.ConnectionError,
+                requests_exceptions.Timeout,
+            ) as e:
+                schedule.release(overloaded=True)
+                if attempt >= constants.JIRA_MAX_RETRIES or not self.can_retry(request):
+                    raise
+                delay = get_backoff_delay(attempt)
+                logger.debug(
+                    "%s %s failed (%s); retrying in %.1fs",
+                    request.method,
+                    request.url,
+                    e,
+                    delay,
+                )
+            else:
+                status = response.status_code
+                schedule.release(overloaded=status in OVERLOADED_STATUSES)
+
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                if retry_after and status in RETRYABLE_STATUSES:
+                    schedule.pause(retry_after)
+
+                if (
+                    status not in RETRYABLE_STATUSES
+                    or attempt >= constants.JIRA_MAX_RETRIES
+                    or not self.can_retry(request, status)
+                ):
+                    return response
+
+                delay = max(retry_after or 0, get_backoff_delay(attempt))
+                logger.debug(
+                    "%s %s returned %s; retrying in %.1fs",
+                    request.method,
+                    request.url,
+                    status,
+                    delay,
+                )
+                response.close()
+
+            attempt += 1
+            time.sleep(delay)
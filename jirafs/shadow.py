@@ -0,0 +1,265 @@
+import hashlib
+import os
+
+from . import constants
+from .exceptions import GitCommandError
+
+
+def get_blob_hash(content, like=None):
+    """Return the git object id ``content`` would be stored under.
+
+    ``like`` is an existing object id; if it is a SHA-256 id, the
+    SHA-256 object id is returned instead of the SHA-1 one.
+
+    """
+    algorithm = "sha256" if like is not None and len(like) == 64 else "sha1"
+    hashed = hashlib.new(algorithm, b"blob %d\0" % len(content))
+    hashed.update(content)
+    return hashed.hexdigest()
+
+
+class ShadowTree(object):
+    """The contents of the ``jira`` branch, staged in memory.
+
+    Files written here are committed directly onto the ``jira`` branch of
+    the ticket folder's repository using git's plumbing commands
+    (``hash-object``, ``mktree``, ``commit-tree`` and ``update-ref``), so
+    no second working tree is needed to record remote changes.
+
+    Each file written is stored in the repository's object database
+    straight away; only its object id is held until ``commit``.
+
+    """
+
+    def __init__(self, folder, branch="jira"):
+        self.folder = folder
+        self.branch = branch
+        self._pending = {}
+        self._head = None
+        self._tree = None
+        self._directories = None
+
+    @property
+    def ref(self):
+        return "refs/heads/%s" % self.branch
+
+    @property
+    def has_pending_changes(self):
+        return bool(self._pending)
+
+    def run_git_command(self, *args, **kwargs):
+        return self.folder.run_git_command(*args, **kwargs)
+
+    def read(self, path, binary=False):
+        if path in self._pending:
+            object_hash = self._pending[path]
+            if object_hash is None:
+                raise FileNotFoundError(path)
+            content = self.run_git_command("cat-file", "blob", object_hash, binary=True)
+        else:
+            try:
+                content = self.run_git_command(
+                    "cat-file", "blob", "%s:%s" % (self.ref, path), binary=True
+                )
+            except GitCommandError:
+                raise FileNotFoundError(path)
+
+        if binary:
+            return content
+        return content.decode("utf-8")
+
+    def load(self, refresh=False):
+        """Return the branch's tree entries, listing them only when needed."""
+        if self._directories is None or refresh:
+            head, tree = self.get_head()
+            if self._directories is None or head != self._head:
+                self._head, self._tree = head, tree
+                self._directories = self.get_tree_entries(head)
+        return self._directories
+
+    def get_entry(self, directories, path):
+        directory, name = os.path.split(path)
+        return directories.get(directory, {}).get(name)
+
+    def get_blob_id(self, path):
+        """Return the object id of the content at ``path``, if any."""
+        if path in self._pending:
+            return self._pending[path]
+
+        directory, name = os.path.split(path)
+        entry = self.load().get(directory, {}).get(name)
+        return entry[2] if entry is not None else None
+
+    def get_content_id(self, content):
+        """Return the object id ``content`` would be stored under."""
+        if isinstance(content, str):
+            content = content.encode("utf-8")
+        self.load()
+        return get_blob_hash(content, like=self._head)
+
+    def write(self, path, content):
+        """Stage ``content`` at ``path``; return whether it differs."""
+        if isinstance(content, str):
+            content = content.encode("utf-8")
+
+        entry = self.get_entry(self.load(), path)
+        if entry is not None and entry[2] == get_blob_hash(content, like=entry[2]):
+            self._pending.pop(path, None)
+            return False
+
+        self._pending[path] = self.hash_blob(content)
+        return True
+
+    def delete(self, path):
+        self._pending[path] = None
+
+    def get_head(self):
+        """Return the current commit and root tree of the branch."""
+        try:
+            commit, tree = self.run_git_command(
+                "rev-parse", self.ref, "%s^{tree}" % self.ref
+            ).split("\n")
+        except GitCommandError:
+            return None, None
+        return commit, tree
+
+    def get_tree_entries(self, revision):
+        """Return ``{directory: {name: (mode, type, hash)}}`` for a revision."""
+        directories = {"": {}}
+        if revision is None:
+            return directories
+
+        listing = self.run_git_command(
+            "ls-tree", "-r", "-t", "-z", revision, binary=True
+        ).decode("utf-8")
+        for line in listing.split("\0"):
+            if not line:
+                continue
+            info, path = line.split("\t", 1)
+            mode, object_type, object_hash = info.split(" ")
+            directory, name = os.path.split(path)
+            directories.setdefault(directory, {})[name] = (
+                mode,
+                object_type,
+                object_hash,
+            )
+            if object_type == "tree":
+                directories.setdefault(path, {})
+
+        return directories
+
+    def hash_blob(self, content):
+        return self.run_git_command("hash-object", "-w", "--stdin", stdin=content)
+
+    def make_tree(self, entries):
+        tree_input = "".join(
+            "%s %s %s\t%s\0" % (mode, object_type, object_hash, name)
+            for name, (mode, object_type, object_hash) in entries.items()
+        )
+        return self.run_git_command("mktree", "-z", stdin=tree_input.encode("utf-8"))
+
+    def apply_pending(self, directories):
+        """Apply pending writes to ``directories``; return the changed ones."""
+        dirty = set()
+
+        for path, object_hash in self._pending.items():
+            entry = self.get_entry(directories, path)
+            directory, name = os.path.split(path)
+
+            if object_hash is None:
+                if entry is not None:
+                    del directories[directory][name]
+                    dirty.add(directory)
+                continue
+            elif entry is not None and entry[2] == object_hash:
+                continue
+
+            mode = entry[0] if entry is not None else "100644"
+            directories.setdefault(directory, {})[name] = (mode, "blob", object_hash)
+            dirty.add(directory)
+
+        # Every directory above a changed directory changes, too.
+        for directory in list(dirty):
+            while directory:
+                parent, name = os.path.split(directory)
+                directories.setdefault(parent, {})
+                dirty.add(parent)
+                directory = parent
+
+        return dirty
+
+    def build_tree(self, directories, dirty):
+        # Deepest directories first so each parent can reference the
+        # hash of its freshly-built children.
+        for directory in sorted(dirty, key=lambda d: -d.count("/") - bool(d)):
+            entries = directories.get(directory, {})
+            if not directory:
+                continue
+            parent, name = os.path.split(directory)
+            if entries:
+                directories[parent][name] = ("040000", "tree", self.make_tree(entries))
+            else:
+                directories[parent].pop(name, None)
+
+        return self.make_tree(directories[""])
+
+    def commit(self, message):
+        """Commit pending writes onto the branch.
+
+        Returns the hash of the new commit, or ``None`` if the pending
+        writes did not change the branch's contents.
+
+        """
+        if not self._pending:
+            return None
+
+        directories = self.load(refresh=True)
+        parent, parent_tree = self._head, self._tree
+        dirty = self.apply_pending(directories)
+        self._pending = {}
+        if not dirty:
+            return None
+
+        tree = self.build_tree(directories, dirty)
+        self._tree = tree
+        if tree == parent_tree:
+            return None
+
+        args = ["commit-tree", tree]
+        if parent is not None:
+            args.extend(["-p", parent])
+        args.extend(["-m", message])
+        commit = self.run_git_command(
+            *args,
+            env={
+                "GIT_AUTHOR_NAME": constants.GIT_AUTHOR_NAME,
+                "GIT_AUTHOR_EMAIL": constants.GIT_AUTHOR_EMAIL,
+            }
+        )
+
+        update_args = ["update-ref", self.ref, commit]
+        if parent is not None:
+            update_args.append(parent)
+        self.run_git_command(*update_args)
+        self._head = commit
+
+        return commit
+
+    def fast_forward(self, revision):
+        """Move the branch forward to ``revision``, a descendant of it."""
+        target = self.run_git_command("rev-parse", revision)
+        current = self.run_git_command("rev-parse", self.ref)
+        if target == current:
+            return
+
+        try:
+            self.run_git_command("merge-base", "--is-ancestor", current, target)
+        except GitCommandError:
+            raise GitCommandError(
+                "Cannot fast-forward %s to %s" % (self.branch, revision),
+                returncode=1,
+                stdout=b"",
+                cmd="update-ref %s %s %s" % (self.ref, target, current),
+            )
+        self.run_git_command("update-ref", self.ref, target, current)
+        self._directories = None
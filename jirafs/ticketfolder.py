@@ -4,19 +4,28 @@ import fnmatch
 import io
 import json
 import logging
-import logging.handlers
 import os
 import re
 import subprocess
+import weakref
 from urllib import parse
 
-from jira.resources import Issue
-
-from . import constants, exceptions, migrations, utils
+from . import (
+    __version__,
+    constants,
+    exceptions,
+    ignore,
+    issuecache,
+    migrations,
+    operationlog,
+    utils,
+)
+from .attachments import AttachmentIndex, get_metadata_entry
 from .exceptions import MacroError
 from .jirafieldmanager import JiraFieldManager
 from .jiralinkmanager import JiraLinkManager
 from .plugin import MacroPlugin, PluginValidationError
+from .shadow import ShadowTree
 
 
 class TicketFolderLoggerAdapter(logging.LoggerAdapter):
@@ -30,40 +39,91 @@ class TicketFolderLoggerAdapter(logging.LoggerAdapter):
         )
 
 
+def get_folder_version(path):
+    """Return the repository version of the ticket folder at ``path``."""
+    try:
+        with io.open(
+            os.path.join(path, constants.METADATA_DIR, "version"), "r", encoding="utf-8"
+        ) as _in:
+            return int(_in.read().strip())
+    except IOError:
+        return 1
+
+
+class SubtaskDescriptor(object):
+    """A subtask of a ticket folder, listed in its ``.jirafs/subtasks``.
+
+    The subtask's ``TicketFolder`` is constructed (lazily) only when
+    ``folder`` is first used.
+
+    """
+
+    def __init__(self, parent, key):
+        self.parent = parent
+        self.key = key
+        self.path = parent.get_path(key)
+
+    def __repr__(self):
+        return "<SubtaskDescriptor %s at %s>" % (self.key, self.path)
+
+    @property
+    def ticket_number(self):
+        return self.key
+
+    @property
+    def exists(self):
+        return os.path.isdir(os.path.join(self.path, constants.METADATA_DIR))
+
+    @property
+    def version(self):
+        return get_folder_version(self.path)
+
+    @property
+    def folder(self):
+        if not hasattr(self, "_folder"):
+            self._folder = self.parent.__class__(
+                self.path, utils.lazy_get_jira(), lazy=True
+            )
+        return self._folder
+
+    def close(self):
+        if hasattr(self, "_folder"):
+            self._folder.close()
+
+
 class TicketFolder(object):
-    def __init__(self, path, jira, migrate=True, quiet=False):
+    def __init__(self, path, jira, migrate=True, quiet=False, lazy=False):
+        """A local copy of a Jira issue.
+
+        Unless ``lazy`` is set, the folder is made ready for use as it is
+        constructed: migrations are run, a missing ``new_comment.jira``
+        is created and the ignore files are updated.  A lazily-constructed
+        folder does this only once its contents are first read or a git
+        command is run, so constructing one is cheap.
+
+        """
         self.path = os.path.realpath(os.path.expanduser(path))
         self.quiet = quiet
         self.issue_url = self.get_ticket_url()
         self.get_jira = jira
+        self.migrate_on_prepare = migrate
 
         if not os.path.isdir(self.metadata_dir):
             raise exceptions.NotTicketFolderException(
                 "%s is not a synchronizable ticket folder" % (path)
             )
 
-        self._formatter = logging.Formatter(
-            fmt="%(asctime)s\t%(levelname)s\t%(module)s\t%(message)s"
-        )
-        self._handler = logging.handlers.RotatingFileHandler(
-            self.get_metadata_path(constants.TICKET_OPERATION_LOG),
-            maxBytes=2**20,
-            backupCount=2,
-            encoding="utf-8",
-        )
-        self._handler.setFormatter(self._formatter)
-        self._logger = logging.getLogger(
-            ".".join([__name__, self.ticket_number.replace("-", "_")])
-        )
-        self._logger.addHandler(self._handler)
-        self._logger_adapter = TicketFolderLoggerAdapter(
-            self._logger,
-            {"issue_id": self.ticket_number},
-        )
+        self._prepared = False
+        if not lazy:
+            self.prepare()
 
-        self.plugins = self.load_plugins()
+    def prepare(self):
+        if self._prepared:
+            return
+        # Set first; migrations and ignore file updates run git commands.
+        self._prepared = True
 
-        if migrate:
+        if self.migrate_on_prepare:
             self.run_migrations()
 
         # If no `new_comment.jira.txt` file exists, let's create one
@@ -73,12 +133,45 @@ class TicketFolder(object):
                 out.write("")
 
         # Let's update the ignore file while we're here.
-        self.build_ignore_files()
+        self.update_ignore_files()
 
     @property
     def logger(self):
+        if not hasattr(self, "_logger_adapter"):
+            self._logger = logging.getLogger(
+                ".".join([__name__, self.ticket_number.replace("-", "_")])
+            )
+            operationlog.acquire(self._logger, self.log_path)
+            # Release the log's handler even if ``close`` isn't called.
+            self._release_log = weakref.finalize(
+                self, operationlog.release, self._logger, self.log_path
+            )
+            self._logger_adapter = TicketFolderLoggerAdapter(
+                self._logger,
+                {"issue_id": self.ticket_number},
+            )
         return self._logger_adapter
 
+    def close(self):
+        """Release the resources (e.g. the open log file) this folder holds."""
+        if hasattr(self, "_logger_adapter"):
+            self._release_log()
+            del self._logger_adapter
+        for subtask in getattr(self, "_subtask_descriptors", []):
+            subtask.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def plugins(self):
+        if not hasattr(self, "_plugins"):
+            self._plugins = self.load_plugins()
+        return self._plugins
+
     def __repr__(self):
         value = self.__str__()
         return "<%s>" % value
@@ -87,27 +180,28 @@ class TicketFolder(object):
         return "[%s] at %s" % (self.ticket_number, self.path)
 
     @property
-    def subtasks(self):
-        if hasattr(self, "_subtasks"):
-            return self._subtasks
-        self._subtasks = []
+    def subtask_descriptors(self):
+        """Describe this issue's subtasks without constructing their folders."""
+        if hasattr(self, "_subtask_descriptors"):
+            return self._subtask_descriptors
+        self._subtask_descriptors = []
 
         subtasks_path = self.get_metadata_path("subtasks")
         if not os.path.exists(subtasks_path):
-            return self._subtasks
+            return self._subtask_descriptors
 
         with open(subtasks_path, "r") as in_:
             for line in in_:
                 ticket_number = line.strip()
-                folder = self.__class__(
-                    self.get_path(
-                        ticket_number,
-                    ),
-                    utils.lazy_get_jira(),
-                )
-                self._subtasks.append(folder)
+                if not ticket_number:
+                    continue
+                self._subtask_descriptors.append(SubtaskDescriptor(self, ticket_number))
 
-        return self._subtasks
+        return self._subtask_descriptors
+
+    @property
+    def subtasks(self):
+        return [subtask.folder for subtask in self.subtask_descriptors]
 
     def load_plugins(self):
         config = self.get_config()
@@ -162,6 +256,7 @@ class TicketFolder(object):
             config = utils.get_config(
                 additional_configs=[local_config_file],
                 include_global=False,
+                writable=True,
             )
             if not config.has_section(section):
                 config.add_section(section)
@@ -169,6 +264,7 @@ class TicketFolder(object):
 
             with open(local_config_file, "w") as out:
                 config.write(out)
+            utils.clear_config_cache()
 
             self.run_git_command("add", ".jirafs/config")
             self.run_git_command("commit", "-m", "Config change", failure_ok=True)
@@ -201,46 +297,95 @@ class TicketFolder(object):
     @property
     def issue(self):
         if not hasattr(self, "_issue"):
-            self._issue = self.jira.issue(self.ticket_number)
+            from .asyncjira import get_prefetched_issue
+
+            issue = get_prefetched_issue(self.jira_base, self.ticket_number)
+            if issue is None:
+                issue = self.jira.issue(self.ticket_number)
+            self._issue = issue
         return self._issue
 
+    def get_comment_page_size(self):
+        config = self.get_config()
+        if config.has_option(constants.CONFIG_MAIN, "comment_page_size"):
+            return config.getint(constants.CONFIG_MAIN, "comment_page_size")
+        return constants.DEFAULT_COMMENT_PAGE_SIZE
+
+    def iter_comments(self, page_size=None):
+        """Yield every comment on this issue in the order they were posted.
+
+        The issue payload embeds only the first page of comments; any
+        remaining pages are requested from the comment API, ``page_size``
+        comments at a time, only as the caller consumes them.
+
+        """
+        from jira.resources import Comment
+
+        if page_size is None:
+            page_size = self.get_comment_page_size()
+
+        embedded = getattr(self.issue.fields, "comment", None)
+        comments = getattr(embedded, "comments", [])
+        yield from comments
+
+        start_at = len(comments)
+        total = getattr(embedded, "total", start_at)
+        while start_at < total:
+            data = self.jira._get_json(
+                "issue/%s/comment" % self.ticket_number,
+                params={"startAt": start_at, "maxResults": page_size},
+            )
+            page = data.get("comments", [])
+            if not page:
+                break
+            for raw in page:
+                yield Comment(self.jira._options, self.jira._session, raw=raw)
+            start_at += len(page)
+            total = data.get("total", total)
+
     def clear_cache(self):
         if hasattr(self, "_issue"):
             del self._issue
         if hasattr(self, "_jira"):
             del self._jira
 
-    def serialize(self) -> str:
+    def get_issue_cache_format(self):
+        config = self.get_config()
+        if config.has_option(constants.CONFIG_MAIN, "issue_cache_format"):
+            return config.get(constants.CONFIG_MAIN, "issue_cache_format")
+        return constants.DEFAULT_ISSUE_CACHE_FORMAT
+
+    def serialize(self, format=None) -> bytes:
+        if format is None:
+            format = self.get_issue_cache_format()
+
         options = copy.copy(self.issue._options)
         if "default_batch_size" in options:
             # This will have classes as keys, which will cause everything
             # to have a real problem; let's just pop this off
             options.pop("default_batch_size")
 
-        storable = {"options": options, "raw": self.issue.raw}
-
-        return json.dumps(
-            storable,
-            indent=4,
-            sort_keys=True,
-            ensure_ascii=False,
-        )
+        return issuecache.dumps(options, self.issue.raw, format=format)
 
     def store_cached_issue(self, shadow=True):
-        with io.open(
-            self.get_path(".jirafs/issue.json", shadow=shadow),
-            "w",
-            encoding="utf-8",
-        ) as out:
+        if shadow:
+            self.shadow.write(constants.ISSUE_CACHE, self.serialize())
+            return
+
+        with io.open(self.get_local_path(constants.ISSUE_CACHE), "wb") as out:
             out.write(self.serialize())
 
     @property
     def cached_issue(self):
+        self.prepare()
         if not hasattr(self, "_cached_issue"):
             try:
-                issue_path = self.get_metadata_path("issue.json")
-                with io.open(issue_path, "r", encoding="utf-8") as _in:
-                    storable = json.loads(_in.read())
+                issue_path = self.get_local_path(constants.ISSUE_CACHE)
+                from jira.resources import Issue
+
+                with io.open(issue_path, "rb") as _in:
+                    header, storable = issuecache.loads(_in.read())
+                    self._cached_issue_header = header
                     self._cached_issue = Issue(
                         storable["options"],
                         None,
@@ -254,6 +399,36 @@ class TicketFolder(object):
                 self._cached_issue = self.issue
         return self._cached_issue
 
+    @property
+    def cached_issue_header(self):
+        """Frequently-needed values from the cached issue.
+
+        Includes the issue's ``key``, ``self`` URL, ``permalink``,
+        ``updated`` timestamp and ``attachments``; unless the cache is
+        stored in the ``pretty`` format, these are read without decoding
+        the full issue payload.
+
+        """
+        self.prepare()
+        if not hasattr(self, "_cached_issue_header"):
+            try:
+                self._cached_issue_header = issuecache.load_header(
+                    self.get_local_path(constants.ISSUE_CACHE)
+                )
+            except IOError:
+                self.log(
+                    "Error encountered while loading cached issue!",
+                    level=logging.ERROR,
+                )
+                self._cached_issue_header = {
+                    "key": self.issue.key,
+                    "self": self.issue.self,
+                    "updated": getattr(self.issue.fields, "updated", None),
+                    "permalink": self.issue.permalink(),
+                    "attachments": [],
+                }
+        return self._cached_issue_header
+
     @property
     def metadata_dir(self) -> str:
         return os.path.join(
@@ -294,30 +469,90 @@ class TicketFolder(object):
         return os.path.join(self.metadata_dir, *args)
 
     def get_remote_file_metadata(self, shadow=True):
-        remote_files = self.get_path(".jirafs/remote_files.json", shadow=shadow)
+        self.prepare()
         try:
-            with io.open(remote_files, "r", encoding="utf-8") as _in:
-                data = json.loads(_in.read())
+            if shadow:
+                data = json.loads(self.shadow.read(".jirafs/remote_files.json"))
+            else:
+                with io.open(
+                    self.get_local_path(".jirafs/remote_files.json"),
+                    "r",
+                    encoding="utf-8",
+                ) as _in:
+                    data = json.loads(_in.read())
         except IOError:
             data = {}
 
         return data
 
     def set_remote_file_metadata(self, data, shadow=True):
-        remote_files = self.get_path(".jirafs/remote_files.json", shadow=shadow)
-        with io.open(remote_files, "w", encoding="utf-8") as out:
-            out.write(
-                json.dumps(
-                    data,
-                    indent=4,
-                    sort_keys=True,
-                    ensure_ascii=False,
-                )
-            )
+        content = json.dumps(
+            data,
+            indent=4,
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        if shadow:
+            self.shadow.write(".jirafs/remote_files.json", content)
+            return
+
+        with io.open(
+            self.get_local_path(".jirafs/remote_files.json"), "w", encoding="utf-8"
+        ) as out:
+            out.write(content)
+
+    def get_remote_links(self, refresh=False):
+        """Return the remote links attached to this issue.
+
+        Remote links are cached in ``.jirafs/remote_links.json`` on the
+        ``jira`` branch alongside the cached issue, stamped with the issue's
+        ``updated`` value; the remote links endpoint is only requested
+        when that stamp no longer matches the issue, when a remote link
+        was changed by this process, or when ``refresh`` is set.
+
+        """
+        updated = getattr(self.issue.fields, "updated", None)
+
+        if not refresh and not getattr(self, "_remote_links_stale", False):
+            try:
+                cached = json.loads(self.shadow.read(constants.REMOTE_LINKS_CACHE))
+                if updated is not None and cached.get("updated") == updated:
+                    from jira.resources import RemoteLink
+
+                    return [
+                        RemoteLink(self.jira._options, self.jira._session, raw=raw)
+                        for raw in cached.get("links", [])
+                    ]
+            except (IOError, ValueError):
+                pass
+
+        links = self.jira.remote_links(self.issue)
+        self._remote_links_stale = False
+
+        self.shadow.write(
+            constants.REMOTE_LINKS_CACHE,
+            json.dumps(
+                {"updated": updated, "links": [link.raw for link in links]},
+                indent=4,
+                sort_keys=True,
+                ensure_ascii=False,
+            ),
+        )
+
+        return links
+
+    def invalidate_remote_links(self):
+        self._remote_links_stale = True
 
     def get_local_path(self, *args):
         return os.path.join(self.path, *args)
 
+    @property
+    def shadow(self):
+        if not hasattr(self, "_shadow"):
+            self._shadow = ShadowTree(self)
+        return self._shadow
+
     def get_shadow_path(self, *args):
         return os.path.join(self.get_metadata_path("shadow"), *args)
 
@@ -330,13 +565,7 @@ class TicketFolder(object):
 
     @property
     def version(self):
-        try:
-            with io.open(
-                self.get_metadata_path("version"), "r", encoding="utf-8"
-            ) as _in:
-                return int(_in.read().strip())
-        except IOError:
-            return 1
+        return get_folder_version(self.path)
 
     @property
     def log_path(self):
@@ -422,10 +651,13 @@ class TicketFolder(object):
         return instance
 
     def run_git_command(self, command, *args, **kwargs):
+        self.prepare()
+
         failure_ok = kwargs.get("failure_ok", False)
         shadow = kwargs.get("shadow", False)
         binary = kwargs.get("binary", False)
         stdin = kwargs.get("stdin", "")
+        env = kwargs.get("env")
 
         args = list(args)
 
@@ -450,9 +682,13 @@ class TicketFolder(object):
 
         self.log("Executing git command `%s`", (" ".join(cmd),), logging.DEBUG)
 
+        if env is not None:
+            env = dict(os.environ, **env)
+
         handle = subprocess.Popen(
             cmd,
             cwd=cwd,
+            env=env,
             stdin=subprocess.PIPE,
             stderr=subprocess.STDOUT,
             stdout=subprocess.PIPE,
@@ -632,19 +868,90 @@ class TicketFolder(object):
 
         return {"files": uncommitted}
 
+    @property
+    def attachments(self):
+        """An ``AttachmentIndex`` of the issue's attachments."""
+        issue = self.issue
+        if getattr(self, "_attachments_issue", None) is not issue:
+            self._attachments = AttachmentIndex(
+                getattr(issue.fields, "attachment", None) or []
+            )
+            self._attachments_issue = issue
+        return self._attachments
+
+    def get_attachment_diff(self, metadata=None):
+        """Compare the issue's attachments with the files downloaded from it.
+
+        Attachments matching the globs in ``.jirafs_remote_ignore`` are
+        ignored.  Unless ``metadata`` is given, the remote file metadata
+        recorded on the ``jira`` branch is used.
+
+        """
+        if metadata is None:
+            metadata = self.get_remote_file_metadata(shadow=True)
+
+        attachments = self.attachments
+        filenames = self.filter_ignored_files(
+            list(attachments), constants.REMOTE_IGNORE_FILE, allow_nonfile=True
+        )
+        return attachments.diff(metadata, filenames)
+
     def get_remotely_changed(self):
         metadata = self.get_remote_file_metadata(shadow=True)
+        diff = self.get_attachment_diff(metadata)
+        changed = set(diff.added) | set(diff.changed)
 
-        assets = []
-        attachments = self.filter_ignored_files(
-            getattr(self.issue.fields, "attachment", []), constants.REMOTE_IGNORE_FILE
-        )
-        for attachment in attachments:
-            changed = metadata.get(attachment.filename) != attachment.created
-            if changed:
-                assets.append(attachment.filename)
+        # Download again any file whose copy on the ``jira`` branch no
+        # longer matches what was recorded when it was downloaded.
+        for filename in self.attachments:
+            digest = get_metadata_entry(metadata.get(filename)).get("digest")
+            if digest and digest != self.shadow.get_blob_id(filename):
+                changed.add(filename)
+
+        return [filename for filename in self.attachments if filename in changed]
+
+    def get_ignore_matcher(self, *which):
+        """Return a function matching filenames ignored by ``which`` sources.
 
-        return assets
+        ``which`` holds ignore file names (e.g. ``.jirafs_local``) as
+        accepted by ``get_ignore_globs``; the globs listed in both the
+        ticket folder's and the user's copy of each are matched.
+
+        """
+        sources = []
+        for list_path in which:
+            sources.append(self.get_local_path(list_path))
+            sources.append(os.path.expanduser("~/%s" % list_path))
+
+        def get_globs():
+            globs = []
+            for list_path in which:
+                globs.extend(self.get_ignore_globs(list_path))
+            return globs
+
+        return ignore.get_matcher(sources, get_globs)
+
+    def get_existing_files(self, filenames):
+        """Return which of ``filenames`` are files within this folder.
+
+        Reads each directory once rather than checking each file.
+
+        """
+        by_directory = {}
+        for filename in filenames:
+            directory, name = os.path.split(filename)
+            by_directory.setdefault(directory, set()).add(name)
+
+        existing = set()
+        for directory, names in by_directory.items():
+            try:
+                with os.scandir(os.path.join(self.path, directory)) as entries:
+                    for entry in entries:
+                        if entry.name in names and entry.is_file():
+                            existing.add(os.path.join(directory, entry.name))
+            except OSError:
+                pass
+        return existing
 
     def filter_ignored_files(self, files, *which, allow_nonfile=False):
         if len(which) < 1:
@@ -652,32 +959,34 @@ class TicketFolder(object):
         if not isinstance(which, (list, tuple)):
             which = [which]
 
-        for list_path in which:
-            ignore_globs = self.get_ignore_globs(list_path)
-
-            assets = []
-            for fileish in files:
-                # Get the actual filename; this is a little gross -- apologies.
-                filename = fileish
-                attachment = False
-                if not isinstance(fileish, str):
-                    filename = fileish.filename
-                    attachment = True
-
-                if self.file_matches_globs(filename, ignore_globs):
-                    continue
-                if (
-                    not attachment
-                    and not allow_nonfile
-                    and not os.path.isfile(os.path.join(self.path, filename))
-                ):
-                    continue
-                if filename.startswith("."):
-                    continue
-                assets.append(fileish)
-            files = assets
+        is_ignored = self.get_ignore_matcher(*which)
+
+        candidates = []
+        for fileish in files:
+            # Get the actual filename; this is a little gross -- apologies.
+            filename = fileish
+            attachment = False
+            if not isinstance(fileish, str):
+                filename = fileish.filename
+                attachment = True
+
+            if filename.startswith("."):
+                continue
+            if is_ignored(filename):
+                continue
+            candidates.append((fileish, filename, attachment))
+
+        existing = set()
+        if not allow_nonfile:
+            existing = self.get_existing_files(
+                filename for _, filename, attachment in candidates if not attachment
+            )
 
-        return assets
+        return [
+            fileish
+            for fileish, filename, attachment in candidates
+            if attachment or allow_nonfile or filename in existing
+        ]
 
     def get_macro_plugins(self):
         if not hasattr(self, "_macro_plugins"):
@@ -791,6 +1100,7 @@ class TicketFolder(object):
         return data
 
     def get_links(self, revision=None, path=None):
+        self.prepare()
         kwargs = {}
         if not revision:
             kwargs["path"] = path if path else self.path
@@ -799,6 +1109,7 @@ class TicketFolder(object):
         return JiraLinkManager.create(self, **kwargs)
 
     def get_fields(self, revision=None, path=None):
+        self.prepare()
         kwargs = {}
         if not revision:
             kwargs["path"] = path if path else self.path
@@ -807,6 +1118,7 @@ class TicketFolder(object):
         return JiraFieldManager.create(self, **kwargs)
 
     def get_new_comment(self, clear=False, staged=False, ready=False):
+        self.prepare()
         try:
             with io.open(
                 self.get_local_path(constants.TICKET_NEW_COMMENT),
@@ -932,11 +1244,11 @@ class TicketFolder(object):
                     "Your ticket folder at {path} is out-of-date "
                     "and is being automatically updated.".format(path=self.path)
                 )
-        while self.version < constants.CURRENT_REPO_VERSION:
-            migrator = getattr(
-                migrations, "migration_%s" % str(self.version + 1).zfill(4)
-            )
+        single, batched = migrations.plan_migrations(self.version)
+        for migrator in single:
             self.migrate(migrator, loglevel=loglevel, init=init)
+        if batched:
+            self.migrate_batch(batched, loglevel=loglevel, init=init)
 
     def migrate(self, migrator, loglevel=logging.INFO, init=False):
         with utils.stash_local_changes(self):
@@ -944,6 +1256,57 @@ class TicketFolder(object):
             migrator(self, init=init)
             self.log("%s: Migration finished", (migrator.__name__,), loglevel)
 
+    def migrate_batch(self, migrators, loglevel=logging.INFO, init=False):
+        """Apply several migrations, stashing local changes only once.
+
+        The resulting repository version is committed once all of the
+        migrations have been applied (or one has failed).
+
+        """
+        with utils.stash_local_changes(self), migrations.VersionBatch(self) as batch:
+            for migrator in migrators:
+                self.log("%s: Migration started", (migrator.__name__,), loglevel)
+                migrator(self, init=init, batch=batch)
+                self.log("%s: Migration finished", (migrator.__name__,), loglevel)
+
+    def get_ignore_file_stamp(self):
+        """Identify the state of the files the ignore files are built from."""
+        sources = [
+            os.path.expanduser("~/%s" % constants.GIT_IGNORE_FILE_PARTIAL),
+            self.get_path(constants.GIT_IGNORE_FILE_PARTIAL),
+            self.get_metadata_path("subtasks"),
+        ]
+        outputs = [
+            self.get_local_path(constants.GIT_EXCLUDE_FILE),
+            self.get_metadata_path("combined_ignore"),
+        ]
+
+        stamp = [__version__]
+        for path in sources:
+            try:
+                stat = os.stat(path)
+                stamp.append([path, stat.st_mtime_ns, stat.st_size])
+            except OSError:
+                stamp.append([path, None, None])
+        for path in outputs:
+            stamp.append([path, os.path.exists(path)])
+        return stamp
+
+    def update_ignore_files(self):
+        """Rebuild the ignore files if the files they're built from changed."""
+        try:
+            with io.open(
+                self.get_local_path(constants.GIT_IGNORE_STAMP_FILE),
+                "r",
+                encoding="utf-8",
+            ) as _in:
+                if json.load(_in) == self.get_ignore_file_stamp():
+                    return
+        except (IOError, ValueError):
+            pass
+
+        self.build_ignore_files()
+
     def build_ignore_files(self):
         metadata_excludes = [
             "git",
@@ -995,6 +1358,16 @@ class TicketFolder(object):
             except Exception:
                 pass
 
+        try:
+            with io.open(
+                self.get_local_path(constants.GIT_IGNORE_STAMP_FILE),
+                "w",
+                encoding="utf-8",
+            ) as out:
+                json.dump(self.get_ignore_file_stamp(), out)
+        except IOError:
+            pass
+
     def log(self, message, args=None, level=logging.INFO):
         if args is None:
             args = []
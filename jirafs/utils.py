@@ -2,21 +2,30 @@ import collections
 import configparser
 import contextlib
 import getpass
+import io
 import logging
 import os
-import pkg_resources
 import re
+import shutil
+import stat
 import subprocess
-
-from typing import Dict, Tuple, Optional
-
-from jira.client import JIRA
-from jira.resources import Comment
+import tempfile
+import threading
 from distutils.version import LooseVersion
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
 
-from . import constants
+from . import cache, constants, registry
+from .exceptions import UserInputDisabled
 from .plugin import CommandPlugin, Plugin
 
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+if TYPE_CHECKING:
+    from jira.resources import Comment
+
 
 logger = logging.getLogger(__name__)
 
@@ -48,7 +57,7 @@ def stash_local_changes(repo):
 
 def get_user_input(message, options=None, boolean=False, password=False):
     if not constants.ALLOW_USER_INPUT:
-        raise RuntimeError("User input is disabled")
+        raise UserInputDisabled("User input is disabled")
 
     value = None
     while value is None:
@@ -82,56 +91,11 @@ def run_command_method_with_kwargs(command, method=None, **kwargs):
 
 
 def get_installed_commands():
-    possible_commands = {}
-    for entry_point in pkg_resources.iter_entry_points(group="jirafs_commands"):
-        try:
-            loaded_class = entry_point.load()
-        except ImportError:
-            logger.warning(
-                "Attempted to load entrypoint %s, but " "an ImportError occurred.",
-                entry_point,
-            )
-            continue
-        if not issubclass(loaded_class, CommandPlugin):
-            logger.warning(
-                "Loaded entrypoint %s, but loaded class is "
-                "not a subclass of `jirafs.plugin.CommandPlugin`.",
-                entry_point,
-            )
-            continue
-        possible_commands[entry_point.name] = loaded_class
-
-    return possible_commands
+    return registry.get_registry(registry.COMMANDS_GROUP, CommandPlugin)
 
 
 def get_installed_plugins(subclass=Plugin):
-    possible_plugins = {}
-    for entry_point in pkg_resources.iter_entry_points(group="jirafs_plugins"):
-        try:
-            loaded_class = entry_point.load()
-        except ImportError:
-            logger.warning(
-                "Attempted to load entrypoint %s, but " "an ImportError occurred.",
-                entry_point,
-            )
-            continue
-        if not issubclass(loaded_class, Plugin):
-            logger.warning(
-                "Loaded entrypoint %s, but loaded class is "
-                "not a subclass of `jirafs.plugin.Plugin`.",
-                entry_point,
-            )
-            continue
-        if not issubclass(loaded_class, subclass):
-            # Do not emit a warning here -- this filter occurs
-            # when we've limited the acceptable plugins to
-            # a subset of jirafs.plugin.Plugin classes
-            # intentionally, so this test failing is not
-            # an error.
-            continue
-        possible_plugins[entry_point.name] = loaded_class
-
-    return possible_plugins
+    return registry.get_registry(registry.PLUGINS_GROUP, Plugin, subclass=subclass)
 
 
 def get_config_path(filename):
@@ -140,30 +104,186 @@ def get_config_path(filename):
     return os.path.expanduser("~/%s" % filename)
 
 
-def get_config(additional_configs=None, include_global=True):
+class ConfigView(configparser.RawConfigParser):
+    """A parsed configuration shared between callers; it cannot be changed.
+
+    Use ``writable_copy`` to obtain a copy that can be changed.
+
+    """
+
+    _frozen = False
+
+    def freeze(self):
+        self._frozen = True
+        return self
+
+    def writable_copy(self):
+        buffer = io.StringIO()
+        self.write(buffer)
+        parser = configparser.RawConfigParser()
+        parser.read_string(buffer.getvalue())
+        return parser
+
+    def _check_writable(self):
+        if self._frozen:
+            raise TypeError(
+                "This configuration is read-only; use writable_copy() to "
+                "obtain a copy that can be changed."
+            )
+
+    def read(self, *args, **kwargs):
+        self._check_writable()
+        return super(ConfigView, self).read(*args, **kwargs)
+
+    def read_file(self, *args, **kwargs):
+        self._check_writable()
+        return super(ConfigView, self).read_file(*args, **kwargs)
+
+    def read_string(self, *args, **kwargs):
+        self._check_writable()
+        return super(ConfigView, self).read_string(*args, **kwargs)
+
+    def read_dict(self, *args, **kwargs):
+        self._check_writable()
+        return super(ConfigView, self).read_dict(*args, **kwargs)
+
+    def add_section(self, *args, **kwargs):
+        self._check_writable()
+        return super(ConfigView, self).add_section(*args, **kwargs)
+
+    def set(self, *args, **kwargs):
+        self._check_writable()
+        return super(ConfigView, self).set(*args, **kwargs)
+
+    def remove_section(self, *args, **kwargs):
+        self._check_writable()
+        return super(ConfigView, self).remove_section(*args, **kwargs)
+
+    def remove_option(self, *args, **kwargs):
+        self._check_writable()
+        return super(ConfigView, self).remove_option(*args, **kwargs)
+
+
+_config_cache = {}
+
+
+def get_config_file_stamp(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return (path, None, None)
+    return (path, stat.st_mtime_ns, stat.st_size)
+
+
+def clear_config_cache():
+    _config_cache.clear()
+
+
+def get_config(additional_configs=None, include_global=True, writable=False):
+    """Return the configuration merged from the global and given files.
+
+    Unless ``writable`` is set, the returned configuration is a read-only
+    ``ConfigView`` that is re-used until one of its files changes.
+
+    """
     filenames = []
     if include_global:
         filenames.append(get_config_path(constants.GLOBAL_CONFIG))
     if additional_configs:
         filenames.extend(additional_configs)
 
-    parser = configparser.RawConfigParser()
-    parser.read(filenames)
-    return parser
+    if writable:
+        parser = configparser.RawConfigParser()
+        parser.read(filenames)
+        return parser
+
+    stamps = [get_config_file_stamp(filename) for filename in filenames]
+    cached = _config_cache.get(tuple(filenames))
+    if cached is None or cached[0] != stamps:
+        parser = ConfigView()
+        parser.read(filenames)
+        cached = (stamps, parser.freeze())
+        _config_cache[tuple(filenames)] = cached
+
+    return cached[1]
+
+
+def get_writable_config(config=None):
+    if config is None:
+        return get_config(writable=True)
+    elif isinstance(config, ConfigView):
+        return config.writable_copy()
+    return config
+
+
+@contextlib.contextmanager
+def locked_file(path):
+    """Hold an advisory lock on ``path`` (where supported) while in use."""
+    with open(path, "a") as lock:
+        if fcntl is not None:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+
+
+def write_config_atomically(path, config):
+    directory = os.path.dirname(path) or "."
+    fd, temp_path = tempfile.mkstemp(
+        dir=directory, prefix=".%s." % os.path.basename(path)
+    )
+    try:
+        try:
+            os.chmod(temp_path, stat.S_IMODE(os.stat(path).st_mode))
+        except OSError:
+            pass
+        with os.fdopen(fd, "w") as out:
+            config.write(out)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+def update_global_config(changes):
+    """Apply ``{(section, key): value}`` changes to the global config file.
+
+    The file is re-read while holding a lock so concurrent processes
+    cannot overwrite one another's changes, and is only rewritten --
+    atomically -- if a value actually differs from what is stored.
+
+    """
+    if not changes:
+        return
+
+    path = get_config_path(constants.GLOBAL_CONFIG)
+    with locked_file(path + ".lock"):
+        config = configparser.RawConfigParser()
+        config.read(path)
+
+        changed = False
+        for (section, key), value in changes.items():
+            if not config.has_section(section):
+                config.add_section(section)
+            elif config.has_option(section, key):
+                if config.get(section, key) == value:
+                    continue
+            config.set(section, key, value)
+            changed = True
+
+        if changed:
+            write_config_atomically(path, config)
+    clear_config_cache()
 
 
 def set_global_config_value(section, key, value):
-    config = get_config()
-    if not config.has_section(section):
-        config.add_section(section)
-    config.set(section, key, value)
-    with open(get_config_path(constants.GLOBAL_CONFIG), "w") as out:
-        config.write(out)
+    update_global_config({(section, key): value})
 
 
 def get_default_jira_server(config=None):
-    if config is None:
-        config = get_config()
+    config = get_writable_config(config)
 
     if not config.has_section(constants.CONFIG_JIRA):
         config.add_section(constants.CONFIG_JIRA)
@@ -176,15 +296,22 @@ def get_default_jira_server(config=None):
             value = match.groupdict()["domain"]
 
         config.set(constants.CONFIG_JIRA, "server", value)
-
-    with open(
-        os.path.expanduser("~/%s" % constants.GLOBAL_CONFIG), "w"
-    ) as global_config:
-        config.write(global_config)
+        update_global_config({(constants.CONFIG_JIRA, "server"): value})
 
     return config.get(constants.CONFIG_JIRA, "server")
 
 
+# Jira clients shared by every folder handled in this process; keyed by
+# (server, username, verify).
+_jira_clients = {}
+_jira_clients_lock = threading.RLock()
+
+
+def clear_jira_clients():
+    with _jira_clients_lock:
+        _jira_clients.clear()
+
+
 def get_jira(domain=None, config=None):
     def get_section(config, domain):
         if domain is None:
@@ -202,8 +329,8 @@ def get_jira(domain=None, config=None):
         config.add_section(valid_options[0])
         return valid_options[0]
 
-    if config is None:
-        config = get_config()
+    config = get_writable_config(config)
+    changes = {}
 
     if not config.has_section(constants.CONFIG_MAIN):
         config.add_section(constants.CONFIG_MAIN)
@@ -223,29 +350,15 @@ def get_jira(domain=None, config=None):
     else:
         login_data["server"] = get_default_jira_server(config)
         # Config may have been changed as a result of the above; reload.
-        config = get_config()
+        config = get_config(writable=True)
 
     if not config.has_option(section, "username"):
         value = get_user_input("Jira Username (%s):" % login_data["server"])
         login_data["username"] = value
-        config.set(section, "username", value)
+        changes[(section, "username")] = value
     else:
         login_data["username"] = config.get(section, "username")
 
-    if not config.has_option(section, "password"):
-        value = get_user_input(
-            "Jira Password (%s):" % login_data["server"],
-            password=True,
-        )
-        login_data["password"] = value
-
-        if ask_to_save:
-            save = get_user_input("Save Jira Password (Y/N)?", boolean=True)
-            if save:
-                config.set(section, "password", value)
-    else:
-        login_data["password"] = config.get(section, "password")
-
     if config.has_option(section, "verify"):
         value = convert_to_boolean(config.get(section, "verify"))
         if value is None:
@@ -255,17 +368,63 @@ def get_jira(domain=None, config=None):
         else:
             login_data["verify"] = value
 
-    # Prevent python-jira from checking to see if its out of date.
-    login_data["check_update"] = False
-
-    basic_auth = (
-        login_data.pop("username"),
-        login_data.pop("password"),
+    client_key = (
+        login_data["server"].rstrip("/"),
+        login_data["username"],
+        login_data["verify"],
     )
-    jira = JIRA(login_data, basic_auth=basic_auth)
+    with _jira_clients_lock:
+        if client_key in _jira_clients:
+            update_global_config(changes)
+            return _jira_clients[client_key]
+
+        if not config.has_option(section, "password"):
+            value = get_user_input(
+                "Jira Password (%s):" % login_data["server"],
+                password=True,
+            )
+            login_data["password"] = value
+
+            if ask_to_save:
+                save = get_user_input("Save Jira Password (Y/N)?", boolean=True)
+                if save:
+                    changes[(section, "password")] = value
+        else:
+            login_data["password"] = config.get(section, "password")
+
+        # Prevent python-jira from checking to see if its out of date.
+        login_data["check_update"] = False
+
+        from jira.client import JIRA
+
+        from .httpcache import CachingAdapter
 
-    with open(get_config_path(constants.GLOBAL_CONFIG), "w") as global_config:
-        config.write(global_config)
+        basic_auth = (
+            login_data.pop("username"),
+            login_data.pop("password"),
+        )
+        # The server's information is requested below, once the adapter
+        # is mounted, so that request is cached and scheduled too.
+        jira = JIRA(login_data, basic_auth=basic_auth, get_server_info=False)
+
+        # Allow folders and subtasks handled concurrently to each keep a
+        # connection to Jira alive.
+        adapter = CachingAdapter(
+            pool_connections=constants.JIRA_CONNECTION_POOL_SIZE,
+            pool_maxsize=constants.JIRA_CONNECTION_POOL_SIZE,
+        )
+        jira._session.mount("https://", adapter)
+        jira._session.mount("http://", adapter)
+        # Retries are handled by the adapter; don't retry them again.
+        jira._session.max_retries = 0
+
+        server_info = jira.server_info()
+        jira._version = tuple(server_info["versionNumbers"])
+        jira.deploymentType = server_info.get("deploymentType")
+
+        _jira_clients[client_key] = jira
+
+    update_global_config(changes)
 
     return jira
 
@@ -279,6 +438,42 @@ def get_git_version():
     return LooseVersion(version_string)
 
 
+GIT_CAPABILITIES_CACHE = "git_capabilities.json"
+
+GitCapabilities = collections.namedtuple("GitCapabilities", ["version"])
+
+_git_capabilities = None
+
+
+def get_git_capabilities():
+    """Return the installed git's capabilities (currently, its version).
+
+    Probing git requires running it, so the result is cached on disk
+    keyed by the path and modification time of the ``git`` executable;
+    upgrading git changes its modification time and so its cache key.
+
+    """
+    global _git_capabilities
+
+    if _git_capabilities is None:
+        executable = shutil.which("git")
+        key = None
+        if executable:
+            executable = os.path.realpath(executable)
+            key = [executable, os.stat(executable).st_mtime_ns]
+
+        cached = cache.read_json_cache(GIT_CAPABILITIES_CACHE, key)
+        if key is None or cached is None:
+            version = get_git_version()
+            cached = {"version": str(version)}
+            if key is not None:
+                cache.write_json_cache(GIT_CAPABILITIES_CACHE, key, cached)
+
+        _git_capabilities = GitCapabilities(LooseVersion(cached["version"]))
+
+    return _git_capabilities
+
+
 def lazy_get_jira():
     return lambda domain, config=None: get_jira(domain, config)
 
@@ -314,7 +509,7 @@ def find_files_referenced_in_markup(markup: str) -> Dict[str, Tuple[str, int, in
     return matched_files
 
 
-def get_comment_author_display(comment: Comment) -> Optional[str]:
+def get_comment_author_display(comment: "Comment") -> Optional[str]:
     if hasattr(comment.author, "name"):
         return comment.author.name
     elif hasattr(comment.author, "displayName"):
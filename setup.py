@@ -77,6 +77,8 @@ setup(
             "match = jirafs.commands.match:Command",
             "preview = jirafs.commands.preview:Command",
             "version = jirafs.commands.version:Command",
+            "daemon = jirafs.commands.daemon:Command",
+            "migrate = jirafs.commands.migrate:Command",
         ],
     },
 )
@@ -0,0 +1,31 @@
+import subprocess
+import sys
+
+from .base import BaseCommandTestCase
+
+
+class TestFieldCommand(BaseCommandTestCase):
+    def test_local_field_import_budget(self):
+        heavy_modules = ["jira", "jinja2", "watchdog"]
+        script = "\n".join(
+            [
+                "import sys",
+                "from jirafs import cmdline",
+                "sys.argv = ['jirafs', 'field', 'summary']",
+                "try:",
+                "    cmdline.main()",
+                "except SystemExit:",
+                "    pass",
+                "print('IMPORTED:' + ','.join(",
+                "    m for m in %r if m in sys.modules" % (heavy_modules,),
+                "))",
+            ]
+        )
+
+        output = subprocess.check_output(
+            [sys.executable, "-c", script],
+            cwd=self.ticketfolder.path,
+        ).decode("utf-8")
+
+        self.assertIn("Test Issue", output)
+        self.assertEqual(output.strip().split("\n")[-1], "IMPORTED:")
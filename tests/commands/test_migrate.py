@@ -0,0 +1,51 @@
+import argparse
+
+from jirafs import constants
+from jirafs.utils import run_command_method_with_kwargs
+
+from .base import BaseCommandTestCase
+
+
+class TestMigrateCommand(BaseCommandTestCase):
+    def get_version_commits(self):
+        return self.ticketfolder.run_git_command(
+            "log", "--format=%s", "--grep=Upgraded Repository"
+        ).split("\n")
+
+    def test_migrate_all(self):
+        with open(self.ticketfolder.get_metadata_path("version"), "w") as out:
+            out.write("14")
+        self.ticketfolder.run_git_command("commit", "-am", "Downgrade")
+        original_commits = self.get_version_commits()
+
+        result = run_command_method_with_kwargs(
+            "migrate",
+            args=argparse.Namespace(all=True, jobs=2),
+            jira=self.mock_get_jira,
+            path=self.root_folder,
+        )
+
+        self.assertEqual(
+            result,
+            "ALPHA-123: upgraded from v14 to v%s\n" % constants.CURRENT_REPO_VERSION,
+        )
+        self.assertEqual(self.ticketfolder.version, constants.CURRENT_REPO_VERSION)
+        # The version changes are recorded in a single commit.
+        self.assertEqual(
+            self.get_version_commits(),
+            ["Upgraded Repository to v%s" % constants.CURRENT_REPO_VERSION]
+            + original_commits,
+        )
+
+    def test_migrate_up_to_date(self):
+        result = run_command_method_with_kwargs(
+            "migrate",
+            args=argparse.Namespace(all=False, jobs=1),
+            jira=self.mock_get_jira,
+            path=self.ticketfolder.path,
+        )
+
+        self.assertEqual(
+            result,
+            "ALPHA-123: already up-to-date (v%s)\n" % constants.CURRENT_REPO_VERSION,
+        )
@@ -0,0 +1,45 @@
+import asyncio
+
+import mock
+
+from jirafs import asyncjira
+
+from .base import BaseTestCase
+
+
+class TestAsyncJira(BaseTestCase):
+    def setUp(self):
+        self.jira = mock.MagicMock()
+        self.jira.issue.side_effect = lambda key, **kwargs: "Issue %s" % key
+        self.server = "http://jira.example.com/"
+
+    def test_issues_fetched_concurrently(self):
+        async def fetch():
+            async with asyncjira.AsyncJira(self.jira, self.server) as async_jira:
+                return await async_jira.issues(["ALPHA-1", "ALPHA-2", "ALPHA-3"])
+
+        self.assertEqual(
+            asyncio.run(fetch()),
+            ["Issue ALPHA-1", "Issue ALPHA-2", "Issue ALPHA-3"],
+        )
+
+    def test_concurrency_limited_per_server(self):
+        first = asyncjira.AsyncJira(self.jira, self.server)
+        second = asyncjira.AsyncJira(self.jira, self.server.rstrip("/"))
+        other = asyncjira.AsyncJira(self.jira, "http://other.example.com")
+
+        self.assertIs(first.limit, second.limit)
+        self.assertIsNot(first.limit, other.limit)
+        for async_jira in (first, second, other):
+            async_jira.close()
+
+    def test_prefetched_issues_available_within_context(self):
+        keys = ["ALPHA-1", "ALPHA-2"]
+
+        with asyncjira.prefetched_issues(self.jira, self.server, keys):
+            self.assertEqual(
+                asyncjira.get_prefetched_issue(self.server, "ALPHA-2"),
+                "Issue ALPHA-2",
+            )
+
+        self.assertIsNone(asyncjira.get_prefetched_issue(self.server, "ALPHA-2"))
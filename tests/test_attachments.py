@@ -0,0 +1,66 @@
+import mock
+
+from jirafs.attachments import AttachmentIndex, build_metadata_entry, is_current
+
+from .base import BaseTestCase
+
+
+def get_attachment(id, filename, created, size=100):
+    attachment = mock.Mock(id=id, created=created, size=size)
+    attachment.filename = filename
+    return attachment
+
+
+class TestAttachmentIndex(BaseTestCase):
+    def setUp(self):
+        self.index = AttachmentIndex(
+            [
+                get_attachment("1", "diagram.png", "2020-01-01"),
+                get_attachment("2", "notes.txt", "2020-01-02"),
+                get_attachment("3", "diagram.png", "2020-01-03"),
+                get_attachment("4", "build.log", "2020-01-04"),
+            ]
+        )
+
+    def test_lookup(self):
+        self.assertEqual(list(self.index), ["diagram.png", "notes.txt", "build.log"])
+        self.assertEqual(self.index.get("diagram.png").id, "3")
+        self.assertEqual(
+            [attachment.id for attachment in self.index.get_all("diagram.png")],
+            ["1", "3"],
+        )
+        self.assertEqual(self.index.by_id["2"].filename, "notes.txt")
+        self.assertIsNone(self.index.get("missing.txt"))
+
+    def test_diff(self):
+        metadata = {
+            "diagram.png": "2020-01-01",
+            "notes.txt": "2020-01-02",
+            "old.txt": "2019-12-31",
+        }
+
+        diff = self.index.diff(metadata, ["diagram.png", "notes.txt"])
+
+        self.assertEqual(diff.added, [])
+        self.assertEqual(diff.changed, ["diagram.png"])
+        self.assertEqual(diff.removed, ["old.txt"])
+
+        diff = self.index.diff(metadata)
+
+        self.assertEqual(diff.added, ["build.log"])
+
+    def test_metadata_entries(self):
+        attachment = self.index.get("notes.txt")
+        entry = build_metadata_entry(attachment, "abc123")
+
+        self.assertEqual(
+            entry,
+            {"created": "2020-01-02", "id": "2", "size": 100, "digest": "abc123"},
+        )
+        self.assertTrue(is_current(entry, attachment))
+        # Timestamps aren't compared once an entry records an id
+        self.assertTrue(is_current(dict(entry, created="2020-01-02T00:00"), attachment))
+        self.assertFalse(is_current(entry, self.index.get("diagram.png")))
+        # Entries recorded by earlier versions hold only a timestamp
+        self.assertTrue(is_current("2020-01-02", attachment))
+        self.assertFalse(is_current("2020-01-01", attachment))
@@ -1,6 +1,6 @@
 from mock import patch
 
-from jirafs.plugin import CommandResult
+from jirafs.plugin import CommandResult, CommandResultBuilder
 
 from .base import BaseTestCase
 
@@ -21,3 +21,32 @@ class TestCommandResult(BaseTestCase):
                 args, _ = out.call_args_list[idx]
 
                 self.assertEqual(args[0], line + "\n")
+
+
+class TestCommandResultBuilder(BaseTestCase):
+    def test_build(self):
+        builder = CommandResultBuilder(return_code=2)
+        builder.add_line("{t.normal}Line {number}", number=1)
+        builder = builder.add_line("{literal}", no_format=True)
+
+        result = builder.build()
+
+        self.assertIsInstance(result, CommandResult)
+        self.assertEqual(result, "%sLine 1\n{literal}\n" % builder.terminal.normal)
+        self.assertEqual(result.return_code, 2)
+
+    def test_echo_streams_new_lines(self):
+        with patch.object(CommandResultBuilder, "_echo") as out:
+            builder = CommandResultBuilder("Line 1").echo()
+            builder.add_line("Line 2").add_line("Line 3").echo()
+            builder.echo()
+
+            self.assertEqual(
+                [args[0] for args, _ in out.call_args_list],
+                ["Line 1\n", "Line 2\nLine 3\n"],
+            )
+
+        with patch.object(CommandResult, "_echo") as out:
+            builder.add_line("Line 4").build().echo()
+
+            out.assert_called_once_with("Line 4\n")
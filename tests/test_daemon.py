@@ -0,0 +1,112 @@
+import configparser
+import os
+import shutil
+import sys
+import tempfile
+import threading
+
+import mock
+
+from jirafs import __version__, daemon
+from jirafs.exceptions import UserInputDisabled
+
+from .base import BaseTestCase
+
+
+class TestDaemon(BaseTestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.socket_path = os.path.join(self.temp_dir, "daemon.sock")
+        self.config = configparser.RawConfigParser()
+        self.config.read_dict(
+            {
+                "main": {},
+                "jira": {"server": "http://jira.example.com"},
+                "http://jira.example.com": {"username": "me", "password": "secret"},
+            }
+        )
+        config_patch = mock.patch("jirafs.utils.get_config", return_value=self.config)
+        config_patch.start()
+        self.addCleanup(config_patch.stop)
+        self.server = daemon.create_server(self.socket_path)
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.thread.join()
+        self.server.server_close()
+        shutil.rmtree(self.temp_dir)
+
+    def request(self, request):
+        client = daemon.connect(self.socket_path)
+        try:
+            return list(daemon.send_request(client, request))
+        finally:
+            client.close()
+
+    def run_command(self, *argv, **overrides):
+        request = {
+            "action": "run",
+            "argv": ["jirafs"] + list(argv),
+            "cwd": self.temp_dir,
+            "version": __version__,
+            "environment": daemon.get_environment(),
+        }
+        request.update(overrides)
+        with mock.patch.object(sys, "stdout", self.server.stdout):
+            return self.request(request)
+
+    def test_command_output_is_sent_to_client(self):
+        messages = self.run_command("version")
+
+        self.assertEqual(
+            messages,
+            [
+                {"stdout": "Jirafs version %s" % __version__},
+                {"stdout": "\n"},
+                {"exit": 0},
+            ],
+        )
+        self.assertIsNone(self.server.stdout.target)
+
+    def test_interactive_command_falls_back(self):
+        self.assertEqual(self.run_command("debug"), [{"fallback": True}])
+
+    def test_version_mismatch_falls_back(self):
+        messages = self.run_command("version", version="0.0.0")
+
+        self.assertEqual(messages, [{"fallback": True}])
+
+    def test_missing_credentials_fall_back(self):
+        self.config.remove_option("http://jira.example.com", "password")
+
+        self.assertEqual(self.run_command("version"), [{"fallback": True}])
+
+    def test_input_needed_before_output_falls_back(self):
+        with mock.patch("jirafs.cmdline.run", side_effect=UserInputDisabled()):
+            self.assertEqual(self.run_command("version"), [{"fallback": True}])
+
+    def test_input_needed_after_output_is_an_error(self):
+        def run():
+            print("Merged")
+            raise UserInputDisabled()
+
+        with mock.patch("jirafs.cmdline.run", side_effect=run), mock.patch.object(
+            sys, "stderr", self.server.stderr
+        ):
+            messages = self.run_command("version")
+
+        self.assertEqual(messages[0], {"stdout": "Merged"})
+        self.assertIn("JIRAFS_NO_DAEMON", messages[-2]["stderr"])
+        self.assertEqual(messages[-1], {"exit": 1})
+
+    def test_second_server_refused(self):
+        with self.assertRaises(RuntimeError):
+            daemon.create_server(self.socket_path)
+
+    def test_status(self):
+        (status,) = self.request({"action": "status"})
+
+        self.assertEqual(status["pid"], os.getpid())
+        self.assertEqual(status["commands"], 0)
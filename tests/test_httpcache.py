@@ -0,0 +1,84 @@
+import io
+import shutil
+import tempfile
+
+import mock
+import requests
+
+from jirafs import httpcache, scheduler
+
+from .base import BaseTestCase
+
+
+class TestCachingAdapter(BaseTestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.cache_dir_patch = mock.patch("jirafs.constants.CACHE_DIR", self.cache_dir)
+        self.cache_dir_patch.start()
+        self.adapter = httpcache.CachingAdapter()
+
+    def tearDown(self):
+        self.cache_dir_patch.stop()
+        scheduler.clear_schedules()
+        shutil.rmtree(self.cache_dir)
+
+    def get_response(self, status, body=b"", headers=None):
+        response = requests.Response()
+        response.raw = io.BytesIO(body)
+        response.status_code = status
+        response.headers.update(headers or {})
+        return response
+
+    def get_request(self, method="GET", path="field"):
+        return requests.Request(
+            method,
+            "http://jira.example.com/rest/api/2/%s" % path,
+            auth=("me", "secret"),
+        ).prepare()
+
+    def test_cached_until_expired_then_revalidated(self):
+        with mock.patch.object(scheduler.SchedulingAdapter, "send") as send:
+            send.return_value = self.get_response(
+                200, b'[{"id": "summary"}]', {"ETag": '"abc"'}
+            )
+            self.adapter.send(self.get_request())
+            self.assertEqual(
+                self.adapter.send(self.get_request()).json(), [{"id": "summary"}]
+            )
+            self.assertEqual(send.call_count, 1)
+
+            send.return_value = self.get_response(304)
+            with mock.patch("jirafs.httpcache.time.time", return_value=10**11):
+                response = self.adapter.send(self.get_request())
+
+            self.assertEqual(send.call_count, 2)
+            self.assertEqual(send.call_args[0][0].headers["If-None-Match"], '"abc"')
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json(), [{"id": "summary"}])
+
+    def test_uncached_endpoints_and_invalidation(self):
+        path = "issue/ALPHA-123/transitions"
+        with mock.patch.object(scheduler.SchedulingAdapter, "send") as send:
+            send.side_effect = lambda *args, **kwargs: self.get_response(200, b"{}")
+
+            self.adapter.send(self.get_request(path="issue/ALPHA-123"))
+            self.adapter.send(self.get_request(path="issue/ALPHA-123"))
+            self.assertEqual(send.call_count, 2)
+
+            self.adapter.send(self.get_request(path=path))
+            self.adapter.send(self.get_request(path=path))
+            self.assertEqual(send.call_count, 4)
+
+            self.adapter.send(self.get_request())
+            self.adapter.send(self.get_request(method="POST"))
+            self.adapter.send(self.get_request())
+            self.assertEqual(send.call_count, 7)
+
+    def test_purge(self):
+        with mock.patch.object(scheduler.SchedulingAdapter, "send") as send:
+            send.side_effect = lambda *args, **kwargs: self.get_response(200, b"[]")
+
+            self.adapter.send(self.get_request())
+            httpcache.purge()
+            self.adapter.send(self.get_request())
+            self.assertEqual(send.call_count, 2)
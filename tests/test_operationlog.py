@@ -0,0 +1,52 @@
+import io
+import logging
+import os
+import shutil
+import tempfile
+
+import mock
+
+from jirafs import operationlog
+
+from .base import BaseTestCase
+
+
+class TestOperationLog(BaseTestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, "operation.log")
+        self.logger = logging.getLogger("jirafs.tests.operationlog")
+        self.logger.setLevel(logging.INFO)
+
+    def tearDown(self):
+        operationlog.stop_listener()
+        shutil.rmtree(self.temp_dir)
+
+    def read_log(self):
+        with io.open(self.path, "r", encoding="utf-8") as _in:
+            return _in.read()
+
+    def test_handler_shared_and_closed_on_release(self):
+        operationlog.acquire(self.logger, self.path)
+        operationlog.acquire(self.logger, self.path)
+        self.logger.info("Shared")
+
+        self.assertEqual(len(self.logger.handlers), 1)
+        self.assertEqual(self.read_log().count("Shared"), 1)
+
+        operationlog.release(self.logger, self.path)
+        self.assertEqual(operationlog.get_open_logs()[self.path], 1)
+
+        operationlog.release(self.logger, self.path)
+        self.assertEqual(self.logger.handlers, [])
+        self.assertNotIn(self.path, operationlog.get_open_logs())
+
+    def test_asynchronous_writer(self):
+        with mock.patch("jirafs.constants.ASYNC_OPERATION_LOG", True):
+            operationlog.acquire(self.logger, self.path)
+            self.logger.info("Queued %s", "message")
+            operationlog.release(self.logger, self.path)
+
+        operationlog.stop_listener()
+
+        self.assertIn("Queued message", self.read_log())
@@ -0,0 +1,144 @@
+import io
+import json
+import sys
+
+import mock
+
+from jirafs import output
+from jirafs.plugin import CommandPlugin, CommandResult
+
+from .base import BaseTestCase
+
+
+class TestOutputChannel(BaseTestCase):
+    def setUp(self):
+        self.stream = io.StringIO()
+        self.channel = output.OutputChannel(output.NDJSON, stream=self.stream)
+
+    def get_records(self):
+        return [json.loads(line) for line in self.stream.getvalue().splitlines()]
+
+    def test_result_written_once(self):
+        result = CommandResult("{t.red}Merged{t.normal}")
+
+        self.channel.result(result, "merge", "/ALPHA-123", "ALPHA-123")
+        self.channel.result(result, "merge", "/ALPHA-123", "ALPHA-123")
+        result = result.add_line("Done")
+        self.channel.result(result, "merge", "/ALPHA-123", "ALPHA-123")
+
+        self.assertEqual(
+            self.get_records(),
+            [
+                {
+                    "type": "result",
+                    "command": "merge",
+                    "folder": "/ALPHA-123",
+                    "ticket": "ALPHA-123",
+                    "return_code": 0,
+                    "output": "Merged\n",
+                },
+                {
+                    "type": "result",
+                    "command": "merge",
+                    "folder": "/ALPHA-123",
+                    "ticket": "ALPHA-123",
+                    "return_code": 0,
+                    "output": "Done\n",
+                },
+            ],
+        )
+
+    def test_empty_result_written(self):
+        self.channel.result(CommandResult(), "commit", "/ALPHA-123")
+
+        (record,) = self.get_records()
+        self.assertEqual(record["output"], "")
+        self.assertIsNone(record["ticket"])
+
+    def test_error(self):
+        self.channel.error(90, ValueError("Failed"), "push", "/ALPHA-123")
+
+        self.assertEqual(
+            self.get_records(),
+            [
+                {
+                    "type": "error",
+                    "command": "push",
+                    "folder": "/ALPHA-123",
+                    "exit_code": 90,
+                    "error": "Failed",
+                }
+            ],
+        )
+
+    def test_other_output_sent_to_stderr(self):
+        stdout = io.StringIO()
+        stderr = io.StringIO()
+        channel = output.OutputChannel(output.NDJSON)
+
+        with mock.patch.object(sys, "stdout", stdout), mock.patch.object(
+            sys, "stderr", stderr
+        ):
+            channel.start()
+            print("Nothing to commit")
+            channel.error(90, "Failed", "commit", "/ALPHA-123")
+            channel.stop()
+
+            self.assertIs(sys.stdout, stdout)
+
+        self.assertEqual(stderr.getvalue(), "Nothing to commit\n")
+        self.assertEqual(json.loads(stdout.getvalue())["exit_code"], 90)
+
+    def test_text_echoes_result(self):
+        channel = output.OutputChannel(output.TEXT)
+
+        with mock.patch.object(CommandResult, "_echo") as out:
+            channel.result(CommandResult("Merged"), "merge", "/ALPHA-123")
+            channel.error(90, "Failed", "merge", "/ALPHA-123")
+
+        out.assert_called_once_with("Merged\n")
+
+
+class TestSubtaskResults(BaseTestCase):
+    def setUp(self):
+        self.stream = io.StringIO()
+        self.channel = output.OutputChannel(output.NDJSON, stream=self.stream)
+        patcher = mock.patch.object(output, "_channel", self.channel)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_each_folder_written(self):
+        folder = mock.Mock(
+            path="/ALPHA-123",
+            ticket_number="ALPHA-123",
+            subtask_descriptors=[
+                mock.Mock(path="/ALPHA-123/ALPHA-124", key="ALPHA-124"),
+                mock.Mock(path="/ALPHA-123/ALPHA-125", key="ALPHA-125"),
+            ],
+        )
+
+        def execute_command(extra_args, jira, path, command_name, **kwargs):
+            if path.endswith("ALPHA-125"):
+                raise ValueError("Failed")
+            return CommandResult("Merged %s" % path)
+
+        with mock.patch.object(
+            CommandPlugin, "execute_command", side_effect=execute_command
+        ), mock.patch("jirafs.plugin.logger"):
+            result = CommandPlugin.execute_for_subtasks(
+                CommandResult("Merged parent"), folder, [], None, "merge"
+            )
+
+        self.channel.result(result, "merge", "/ALPHA-123", "ALPHA-123")
+        records = [json.loads(line) for line in self.stream.getvalue().splitlines()]
+
+        self.assertEqual(
+            [(record["folder"], record["return_code"]) for record in records],
+            [
+                ("/ALPHA-123", 0),
+                ("/ALPHA-123/ALPHA-124", 0),
+                ("/ALPHA-123", 1),
+            ],
+        )
+        self.assertEqual(records[1]["output"], "Merged /ALPHA-123/ALPHA-124\n")
+        self.assertIn("ALPHA-125: Failed", records[2]["output"])
@@ -0,0 +1,29 @@
+import io
+import sys
+import time
+
+import mock
+
+from jirafs import parallel
+
+from .base import BaseTestCase
+
+
+class TestRunInOrder(BaseTestCase):
+    def test_output_printed_in_item_order(self):
+        def work(item):
+            # Later items finish first.
+            time.sleep((3 - item) * 0.05)
+            print("Item %s" % item)
+            if item == 1:
+                raise ValueError("Failed")
+            return item * 10
+
+        output = io.StringIO()
+        with mock.patch.object(sys, "stdout", output):
+            results = parallel.run_in_order(work, [0, 1, 2], workers=3)
+            self.assertIs(sys.stdout, output)
+
+        self.assertEqual(output.getvalue(), "Item 0\nItem 1\nItem 2\n")
+        self.assertEqual([result.result for result in results], [0, None, 20])
+        self.assertIsInstance(results[1].error, ValueError)
@@ -0,0 +1,77 @@
+import io
+
+import mock
+import requests
+from requests.adapters import HTTPAdapter
+
+from jirafs import scheduler
+
+from .base import BaseTestCase
+
+
+class TestSchedulingAdapter(BaseTestCase):
+    def setUp(self):
+        scheduler.clear_schedules()
+        self.adapter = scheduler.SchedulingAdapter()
+        self.sleep_patch = mock.patch("jirafs.scheduler.time.sleep")
+        self.sleep = self.sleep_patch.start()
+
+    def tearDown(self):
+        self.sleep_patch.stop()
+        scheduler.clear_schedules()
+
+    def get_response(self, status, headers=None):
+        response = requests.Response()
+        response.raw = io.BytesIO()
+        response.status_code = status
+        response.headers.update(headers or {})
+        return response
+
+    def get_request(self, method="GET"):
+        return requests.Request(
+            method, "http://jira.example.com/rest/api/2/issue/ALPHA-123"
+        ).prepare()
+
+    def test_retry_after_honoured(self):
+        schedule = scheduler.get_server_schedule("http://jira.example.com/")
+        initial_limit = schedule.limit
+
+        with mock.patch.object(HTTPAdapter, "send") as send, mock.patch.object(
+            schedule, "pause"
+        ) as pause:
+            send.side_effect = [
+                self.get_response(429, {"Retry-After": "7"}),
+                self.get_response(200),
+            ]
+            response = self.adapter.send(self.get_request())
+            pause.assert_called_once_with(7)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(send.call_count, 2)
+        self.assertGreaterEqual(self.sleep.call_args[0][0], 7)
+        self.assertEqual(schedule.limit, initial_limit // 2)
+
+    def test_non_idempotent_requests_not_retried_after_error(self):
+        with mock.patch.object(HTTPAdapter, "send") as send:
+            send.return_value = self.get_response(503)
+            response = self.adapter.send(self.get_request("POST"))
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(send.call_count, 1)
+
+    def test_concurrency_limit_recovers(self):
+        schedule = scheduler.ServerSchedule(concurrency=2, max_concurrency=3)
+
+        for _ in range(2):
+            schedule.acquire()
+            schedule.release()
+
+        self.assertEqual(schedule.limit, 3)
+
+    def test_parse_retry_after_date(self):
+        self.assertEqual(
+            scheduler.parse_retry_after(
+                "Wed, 21 Oct 2015 07:28:10 GMT", now=1445412480
+            ),
+            10,
+        )
@@ -1,5 +1,6 @@
 import io
 import json
+import logging
 import os
 import shutil
 import tempfile
@@ -8,7 +9,7 @@ import mock
 import six
 from mock import patch
 
-from jirafs import exceptions
+from jirafs import exceptions, operationlog
 from jirafs.jirafieldmanager import JiraFieldManager
 from jirafs.utils import run_command_method_with_kwargs
 
@@ -65,6 +66,89 @@ class TestTicketFolder(BaseTestCase):
 
         self.assertEquals(actual_result, expected_result)
 
+    def test_shadow_repository_removed(self):
+        self.assertFalse(os.path.exists(self.ticketfolder.get_metadata_path("shadow")))
+
+    def test_shadow_commit(self):
+        original_hash = self.ticketfolder.run_git_command("rev-parse", "jira")
+
+        self.ticketfolder.shadow.write("nested/directory/file.txt", "Content")
+        commit = self.ticketfolder.shadow.commit("Added nested file")
+
+        self.assertEqual(
+            self.ticketfolder.run_git_command("rev-parse", "jira^"), original_hash
+        )
+        self.assertEqual(self.ticketfolder.run_git_command("rev-parse", "jira"), commit)
+        self.assertEqual(
+            self.ticketfolder.get_local_file_at_revision(
+                "nested/directory/file.txt", "jira"
+            ),
+            "Content",
+        )
+        self.assertEqual(
+            self.ticketfolder.get_local_file_at_revision(".jirafs/issue.json", "jira"),
+            self.ticketfolder.get_local_file_at_revision(
+                ".jirafs/issue.json", original_hash
+            ),
+        )
+
+        self.ticketfolder.shadow.write("nested/directory/file.txt", "Content")
+        self.assertIsNone(self.ticketfolder.shadow.commit("Unchanged"))
+
+    def test_new_folder_never_creates_shadow_repository(self):
+        self.assertNotIn(
+            "Shadow Created",
+            self.ticketfolder.run_git_command("log", "--format=%s", "jira"),
+        )
+
+    def test_shadow_write_stores_blob(self):
+        shadow = self.ticketfolder.shadow
+
+        self.assertTrue(shadow.write("attachment.bin", b"\x00Content"))
+        object_hash = shadow.get_blob_id("attachment.bin")
+
+        self.assertEqual(
+            self.ticketfolder.run_git_command("cat-file", "-t", object_hash), "blob"
+        )
+        self.assertEqual(shadow.read("attachment.bin", binary=True), b"\x00Content")
+
+    def test_shadow_skips_unchanged_files(self):
+        shadow = self.ticketfolder.shadow
+        original = shadow.read(".jirafs/issue.json", binary=True)
+
+        with patch.object(shadow, "hash_blob") as hash_blob:
+            self.assertFalse(shadow.write(".jirafs/issue.json", original))
+            self.assertFalse(shadow.has_pending_changes)
+            self.assertIsNone(shadow.commit("Unchanged"))
+            self.assertFalse(hash_blob.called)
+
+        self.assertTrue(shadow.write(".jirafs/issue.json", original + b"\n"))
+        self.assertFalse(shadow.write(".jirafs/issue.json", original))
+        self.assertFalse(shadow.has_pending_changes)
+
+    def test_issue_cache_formats(self):
+        issue_path = self.ticketfolder.get_local_path(".jirafs/issue.json")
+
+        for format in ("pretty", "compact", "binary"):
+            with io.open(issue_path, "wb") as out:
+                out.write(self.ticketfolder.serialize(format=format))
+
+            for attr in ("_cached_issue", "_cached_issue_header"):
+                if hasattr(self.ticketfolder, attr):
+                    delattr(self.ticketfolder, attr)
+
+            header = self.ticketfolder.cached_issue_header
+            self.assertEqual(header["key"], "ALPHA-123")
+            self.assertEqual(header["permalink"], self.ticketfolder.issue.permalink())
+            self.assertEqual(
+                self.ticketfolder.cached_issue.raw, self.ticketfolder.issue.raw
+            )
+
+        with patch("jirafs.issuecache.loads") as loads:
+            del self.ticketfolder._cached_issue_header
+            self.ticketfolder.cached_issue_header
+            self.assertFalse(loads.called)
+
     def test_fetch(self):
         self.ticketfolder._issue = self.rehydrate_issue("test_fetch/fetched.json")
         with patch.object(self.ticketfolder, "clear_cache") as clear_cache:
@@ -77,13 +161,59 @@ class TestTicketFolder(BaseTestCase):
         expected_result = JiraFieldManager(
             self.get_asset_contents("test_fetch/fetched.jira")
         )
-        with io.open(
-            self.ticketfolder.get_shadow_path("fields.jira"), encoding="utf-8"
-        ) as _in:
-            actual_result = JiraFieldManager(_in.read())
+        actual_result = JiraFieldManager(self.ticketfolder.shadow.read("fields.jira"))
 
         self.assertEqual(actual_result, expected_result)
 
+    def test_iter_comments_pages_remaining_comments(self):
+        embedded = self.ticketfolder.issue.fields.comment
+        embedded.total = len(embedded.comments) + 2
+        extra_comments = [
+            {"id": "1", "body": "Fifth", "created": "2014-07-11T01:00:00.000-0400"},
+            {"id": "2", "body": "Sixth", "created": "2014-07-11T02:00:00.000-0400"},
+        ]
+        self.mock_jira._get_json.side_effect = [
+            {"comments": extra_comments[:1], "total": embedded.total},
+            {"comments": extra_comments[1:], "total": embedded.total},
+        ]
+
+        comments = list(self.ticketfolder.iter_comments(page_size=1))
+
+        self.assertEqual(
+            [comment.body for comment in comments[-2:]],
+            ["Fifth", "Sixth"],
+        )
+        self.assertEqual(len(comments), embedded.total)
+        self.assertEqual(
+            self.mock_jira._get_json.call_args_list,
+            [
+                mock.call(
+                    "issue/ALPHA-123/comment",
+                    params={"startAt": 4, "maxResults": 1},
+                ),
+                mock.call(
+                    "issue/ALPHA-123/comment",
+                    params={"startAt": 5, "maxResults": 1},
+                ),
+            ],
+        )
+
+    def test_remote_links_cached_until_issue_updated(self):
+        self.mock_jira.remote_links.reset_mock()
+        self.mock_jira.remote_links.return_value = []
+
+        self.ticketfolder.get_remote_links()
+        self.ticketfolder.get_remote_links()
+        self.assertEqual(self.mock_jira.remote_links.call_count, 0)
+
+        self.ticketfolder.issue.fields.updated = "2014-07-11T00:00:00.000-0400"
+        self.ticketfolder.get_remote_links()
+        self.assertEqual(self.mock_jira.remote_links.call_count, 1)
+
+        self.ticketfolder.invalidate_remote_links()
+        self.ticketfolder.get_remote_links()
+        self.assertEqual(self.mock_jira.remote_links.call_count, 2)
+
     def test_push(self):
         changed_field = u"description"
         changed_value = u"Something Else"
@@ -103,16 +233,10 @@ class TestTicketFolder(BaseTestCase):
                     out.assert_called_with(**{"description": changed_value})
 
     def test_push_rejected_if_updated(self):
-        src_path = self.get_asset_path("test_fetch/fetched.jira")
-        dst_path = self.ticketfolder.get_shadow_path("fields.jira")
-        shutil.copyfile(
-            src_path,
-            dst_path,
+        self.ticketfolder.shadow.write(
+            "fields.jira", self.get_asset_contents("test_fetch/fetched.jira")
         )
-
-        self.ticketfolder.run_git_command("add", "-A", shadow=True)
-        self.ticketfolder.run_git_command("commit", "-m", "Changed", shadow=True)
-        self.ticketfolder.run_git_command("push", "origin", "jira", shadow=True)
+        self.ticketfolder.shadow.commit("Changed")
         with self.assertRaises(exceptions.LocalCopyOutOfDate):
             run_command_method_with_kwargs("push", folder=self.ticketfolder)
 
@@ -188,5 +312,111 @@ class TestTicketFolder(BaseTestCase):
 
         self.assertEqual(expected_output, actual_output)
 
+    def test_shadow_blob_ids(self):
+        shadow = self.ticketfolder.shadow
+        committed = shadow.get_blob_id("description.jira")
+
+        self.assertEqual(
+            committed,
+            self.ticketfolder.run_git_command("rev-parse", "jira:description.jira"),
+        )
+        self.assertIsNone(shadow.get_blob_id("missing.txt"))
+
+        shadow.write("new.txt", "Content")
+        self.assertEqual(
+            shadow.get_blob_id("new.txt"), shadow.get_content_id("Content")
+        )
+
+    def test_subtask_descriptors(self):
+        with io.open(
+            self.ticketfolder.get_metadata_path("subtasks"), "w", encoding="utf-8"
+        ) as out:
+            out.write("ALPHA-124\n\n")
+
+        (subtask,) = self.ticketfolder.subtask_descriptors
+
+        self.assertEqual(subtask.key, "ALPHA-124")
+        self.assertEqual(subtask.path, self.ticketfolder.get_path("ALPHA-124"))
+        self.assertFalse(subtask.exists)
+        self.assertEqual(subtask.version, 1)
+        self.assertFalse(hasattr(subtask, "_folder"))
+        with self.assertRaises(exceptions.NotTicketFolderException):
+            subtask.folder
+
+    def test_lazy_folder_defers_preparation(self):
+        comment_path = self.ticketfolder.get_local_path("new_comment.jira")
+        os.unlink(comment_path)
+
+        folder = self.ticketfolder.__class__(
+            self.ticketfolder.path, self.mock_get_jira, lazy=True
+        )
+        self.assertFalse(os.path.exists(comment_path))
+        self.assertFalse(hasattr(folder, "_logger_adapter"))
+
+        folder.run_git_command("status")
+
+        self.assertTrue(os.path.exists(comment_path))
+
+    def test_folders_share_operation_log_handler(self):
+        log_path = self.ticketfolder.log_path
+        self.ticketfolder.log("First", level=logging.WARNING)
+        with self.ticketfolder.__class__(
+            self.ticketfolder.path, self.mock_get_jira
+        ) as folder:
+            folder.log("Second", level=logging.WARNING)
+            self.assertEqual(operationlog.get_open_logs()[log_path], 2)
+
+        self.assertEqual(operationlog.get_open_logs()[log_path], 1)
+        self.ticketfolder.close()
+        self.assertNotIn(log_path, operationlog.get_open_logs())
+
+        log = self.ticketfolder.get_log()
+        self.assertEqual(log.count("Second"), 1)
+
+    def test_filter_ignored_files(self):
+        for filename in ["notes.txt", "build.log", "nested/data.csv"]:
+            path = self.ticketfolder.get_local_path(filename)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with io.open(path, "w", encoding="utf-8") as out:
+                out.write("Content")
+        with io.open(
+            self.ticketfolder.get_local_path(".jirafs_local"), "w", encoding="utf-8"
+        ) as out:
+            out.write("# Comment\n*.log\n")
+
+        files = ["notes.txt", "build.log", "nested/data.csv", "missing.txt", ".hidden"]
+        self.assertEqual(
+            self.ticketfolder.filter_ignored_files(files),
+            ["notes.txt", "nested/data.csv"],
+        )
+        self.assertEqual(
+            self.ticketfolder.filter_ignored_files(files, allow_nonfile=True),
+            ["notes.txt", "nested/data.csv", "missing.txt"],
+        )
+
+        with io.open(
+            self.ticketfolder.get_local_path(".jirafs_local"), "w", encoding="utf-8"
+        ) as out:
+            out.write("*.log\nnested/*\n")
+
+        self.assertEqual(self.ticketfolder.filter_ignored_files(files), ["notes.txt"])
+
+    def test_ignore_files_rebuilt_only_when_sources_change(self):
+        with patch.object(self.ticketfolder, "build_ignore_files") as build:
+            self.ticketfolder.update_ignore_files()
+            self.assertFalse(build.called)
+
+        with io.open(
+            self.ticketfolder.get_local_path(".jirafs_ignore"), "w", encoding="utf-8"
+        ) as out:
+            out.write("*.tmp\n")
+        self.ticketfolder.update_ignore_files()
+
+        with io.open(
+            self.ticketfolder.get_metadata_path("combined_ignore"), encoding="utf-8"
+        ) as in_:
+            self.assertIn("*.tmp", in_.read())
+
     def tearDown(self):
+        self.ticketfolder.close()
         shutil.rmtree(self.root_folder)
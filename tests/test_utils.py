@@ -1,8 +1,13 @@
+import configparser
+import os
+import shutil
+import tempfile
 from distutils.version import LooseVersion
 
 import mock
 
-from jirafs import utils
+from jirafs import registry, utils
+from jirafs.plugin import CommandPlugin
 
 from .base import BaseTestCase
 
@@ -50,3 +55,211 @@ class TestParseGitVersion(BaseTestCase):
         actual_version = utils.get_git_version()
 
         self.assertEqual(actual_version, LooseVersion("1.9.1"))
+
+
+class TestConfigCache(BaseTestCase):
+    def setUp(self):
+        self.config_dir = tempfile.mkdtemp()
+        self.config_path = os.path.join(self.config_dir, "config")
+        with open(self.config_path, "w") as out:
+            out.write("[main]\ndate_format = %Y\n")
+        utils.clear_config_cache()
+
+    def tearDown(self):
+        utils.clear_config_cache()
+        shutil.rmtree(self.config_dir)
+
+    def get_config(self, **kwargs):
+        return utils.get_config(
+            additional_configs=[self.config_path], include_global=False, **kwargs
+        )
+
+    def test_config_parsed_once(self):
+        config = self.get_config()
+
+        with mock.patch("jirafs.utils.ConfigView.read") as read:
+            self.assertIs(self.get_config(), config)
+            self.assertFalse(read.called)
+
+        self.assertEqual(config.get("main", "date_format"), "%Y")
+
+    def test_config_read_only(self):
+        config = self.get_config()
+
+        with self.assertRaises(TypeError):
+            config.set("main", "date_format", "%m")
+
+        copy = config.writable_copy()
+        copy.set("main", "date_format", "%m")
+        self.assertEqual(config.get("main", "date_format"), "%Y")
+
+    def test_config_reloaded_when_changed(self):
+        config = self.get_config()
+
+        with open(self.config_path, "w") as out:
+            out.write("[main]\ndate_format = %Y-%m\n")
+
+        self.assertEqual(
+            self.get_config().get("main", "date_format"),
+            "%Y-%m",
+        )
+        self.assertEqual(config.get("main", "date_format"), "%Y")
+
+
+class TestUpdateGlobalConfig(BaseTestCase):
+    def setUp(self):
+        self.config_dir = tempfile.mkdtemp()
+        self.config_path = os.path.join(self.config_dir, ".jirafs_config")
+        with open(self.config_path, "w") as out:
+            out.write("[jira]\nserver = http://jira.example.com\n")
+        os.chmod(self.config_path, 0o600)
+        self.global_config_patch = mock.patch(
+            "jirafs.constants.GLOBAL_CONFIG", self.config_path
+        )
+        self.global_config_patch.start()
+
+    def tearDown(self):
+        self.global_config_patch.stop()
+        utils.clear_config_cache()
+        shutil.rmtree(self.config_dir)
+
+    def test_unchanged_config_not_rewritten(self):
+        with mock.patch("jirafs.utils.write_config_atomically") as write:
+            utils.update_global_config({("jira", "server"): "http://jira.example.com"})
+            self.assertFalse(write.called)
+
+    def test_changed_config_written(self):
+        utils.update_global_config({("http://jira.example.com", "username"): "me"})
+
+        config = utils.get_config()
+        self.assertEqual(config.get("jira", "server"), "http://jira.example.com")
+        self.assertEqual(config.get("http://jira.example.com", "username"), "me")
+        self.assertEqual(os.stat(self.config_path).st_mode & 0o777, 0o600)
+
+
+class TestGetJira(BaseTestCase):
+    def setUp(self):
+        utils.clear_jira_clients()
+        self.config = configparser.RawConfigParser()
+        self.config.read_dict(
+            {
+                "http://jira.example.com": {
+                    "username": "me",
+                    "password": "secret",
+                }
+            }
+        )
+
+    def tearDown(self):
+        utils.clear_jira_clients()
+
+    @mock.patch("jira.client.JIRA")
+    def test_client_shared_between_folders(self, jira_class):
+        first = utils.get_jira("http://jira.example.com", config=self.config)
+        second = utils.get_jira("http://jira.example.com/", config=self.config)
+
+        self.assertIs(first, second)
+        self.assertEqual(jira_class.call_count, 1)
+        self.assertTrue(first._session.mount.called)
+
+    @mock.patch("jira.client.JIRA")
+    def test_server_info_requested_through_adapter(self, jira_class):
+        jira = jira_class.return_value
+
+        def server_info():
+            self.assertTrue(jira._session.mount.called)
+            return {"versionNumbers": [9, 4, 0]}
+
+        jira.server_info.side_effect = server_info
+
+        utils.get_jira("http://jira.example.com", config=self.config)
+
+        self.assertFalse(jira_class.call_args[1]["get_server_info"])
+        self.assertEqual(jira.server_info.call_count, 1)
+        self.assertEqual(jira._version, (9, 4, 0))
+
+
+class TestGitCapabilities(BaseTestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.cache_dir_patch = mock.patch("jirafs.constants.CACHE_DIR", self.cache_dir)
+        self.cache_dir_patch.start()
+        utils._git_capabilities = None
+
+    def tearDown(self):
+        self.cache_dir_patch.stop()
+        utils._git_capabilities = None
+        shutil.rmtree(self.cache_dir)
+
+    @mock.patch("jirafs.utils.get_git_version")
+    def test_capabilities_cached(self, get_git_version):
+        get_git_version.return_value = LooseVersion("2.30.1")
+
+        capabilities = utils.get_git_capabilities()
+        self.assertEqual(capabilities.version, LooseVersion("2.30.1"))
+
+        utils._git_capabilities = None
+        self.assertEqual(utils.get_git_capabilities(), capabilities)
+        self.assertEqual(get_git_version.call_count, 1)
+
+
+class TestEntryPointRegistry(BaseTestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.cache_dir_patch = mock.patch("jirafs.constants.CACHE_DIR", self.cache_dir)
+        self.cache_dir_patch.start()
+        registry.clear()
+
+    def tearDown(self):
+        self.cache_dir_patch.stop()
+        registry.clear()
+        shutil.rmtree(self.cache_dir)
+
+    def test_entry_point_table_cached(self):
+        table = registry.get_entry_point_table()
+        self.assertEqual(
+            table[registry.COMMANDS_GROUP]["status"],
+            "jirafs.commands.status:Command",
+        )
+
+        registry.clear()
+        with mock.patch("jirafs.registry.scan_entry_points") as scan:
+            self.assertEqual(registry.get_entry_point_table(), table)
+            self.assertFalse(scan.called)
+
+    def test_commands_imported_on_access(self):
+        commands = utils.get_installed_commands()
+
+        self.assertIn("status", commands.names())
+        self.assertNotIn("status", commands._loaded)
+        self.assertTrue(issubclass(commands["status"], CommandPlugin))
+
+    def test_invalid_entry_points_missing(self):
+        commands = registry.EntryPointRegistry(
+            {
+                "broken": "jirafs.nonexistent:Command",
+                "wrong": "jirafs.utils:get_config",
+            },
+            CommandPlugin,
+        )
+
+        self.assertEqual(commands.names(), ["broken", "wrong"])
+        self.assertNotIn("broken", commands)
+        self.assertNotIn("wrong", commands)
+        self.assertEqual(list(commands), [])
+        self.assertEqual(len(commands), 0)
+        with self.assertRaises(KeyError):
+            commands["broken"]
+
+    def test_invalid_entry_point_error(self):
+        commands = registry.EntryPointRegistry(
+            {
+                "broken": "jirafs.nonexistent:Command",
+                "status": "jirafs.commands.status:Command",
+            },
+            CommandPlugin,
+        )
+
+        self.assertIn("jirafs.nonexistent", commands.get_error("broken"))
+        self.assertIn("No entry point", commands.get_error("missing"))
+        self.assertIsNone(commands.get_error("status"))